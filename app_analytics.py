@@ -1,8 +1,6 @@
 
 import streamlit as st
-import pandas as pd
-import plotly.graph_objs as go
-import os, glob
+import glob
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -26,97 +24,115 @@ if not st.session_state.authenticated:
     login()
     st.stop()
 
+# 📦 DuckDB and charts, loaded once logged in
+import plotly.graph_objs as go
+import duckdb
+from query_engine import connect, register_sources, sources_version, columns, chart, run_sql
+
 st.set_page_config(page_title="📊 MT5 Analytics Dashboard", layout="wide")
 st.title("📈 MT5 Strategy Analysis Dashboard")
 
+# Query engine over trade_logs/ and backtests/, one per server process. Keyed on
+# the files in both folders, so a new or rewritten file gets fresh views at once.
+@st.cache_resource(max_entries=1)
+def get_connection(version=None):
+    con = connect()
+    return con, register_sources(con)
+
+base_con, sources = get_connection(sources_version())
+con = base_con.cursor()  # per-session cursor, DuckDB connections aren't shared across threads
+
 # Load file
 st.sidebar.markdown("### 📂 Select File")
 files = sorted(glob.glob("backtests/*.csv"))
 selected = st.sidebar.selectbox("Select Backtest File", ["Live"] + files)
 
+if selected not in sources:
+    if selected == "Live":
+        st.warning("⚠️ No live trades found (trade_log.csv missing)")
+    else:
+        st.warning("No trade data found.")
+    st.stop()
 if selected != "Live":
-    try:
-        df = pd.read_csv(selected, parse_dates=["timestamp", "close_time"])
-    except ValueError:
-        df = pd.read_csv(selected, parse_dates=["timestamp"])
     st.info(f"📁 Viewing Backtest: {selected}")
-else:
-    path = "trade_logs/trade_log.csv"
-    if not os.path.exists(path):
-        st.warning("⚠️ No live trades found (trade_log.csv missing)")
-        st.stop()
-    try:
-        df = pd.read_csv(path, parse_dates=["timestamp", "close_time"])
-    except ValueError:
-        df = pd.read_csv(path, parse_dates=["timestamp"])
 
-if df.empty:
+src = sources[selected]
+src_columns = columns(con, src)
+
+if chart(con, "row_count", src)["n"].iloc[0] == 0:
     st.warning("No trade data found.")
     st.stop()
 
-df["pnl"] = pd.to_numeric(df["pnl"], errors="coerce")
-df["win"] = df["pnl"] > 0
-df["month"] = df["timestamp"].dt.to_period("M").dt.to_timestamp()
-df["day"] = df["timestamp"].dt.date
-df["hour"] = df["timestamp"].dt.hour
-df["weekday"] = df["timestamp"].dt.day_name()
-
-if "close_time" in df.columns:
-    df["holding_time"] = (df["close_time"] - df["timestamp"]).dt.total_seconds() / 60
-    df["holding_bucket"] = pd.cut(df["holding_time"], bins=[0, 5, 15, 30, 60, 180, 720, float("inf")],
-                                  labels=["<5m", "5-15m", "15-30m", "30-60m", "1-3h", "3-12h", "12h+"])
-
 st.subheader("📊 Summary Metrics")
+overall = chart(con, "summary", src).iloc[0]
 col1, col2, col3 = st.columns(3)
-col1.metric("Total Trades", len(df))
-col2.metric("Total PnL", f"{df['pnl'].sum():.2f}")
-col3.metric("Win Rate", f"{df['win'].mean() * 100:.2f}%")
+col1.metric("Total Trades", int(overall["Trades"]))
+col2.metric("Total PnL", f"{overall['Total_PnL']:.2f}")
+col3.metric("Win Rate", f"{overall['Win_Rate']:.2f}%")
+col4, col5, col6 = st.columns(3)
+col4.metric("Expectancy", f"{overall['Expectancy']:.2f}")
+col5.metric("Sortino (per trade)", f"{overall['Sortino']:.2f}")
+col6.metric("Max Drawdown", f"{overall['Max_Drawdown']:.2f}")
 
 # Win Rate Trend
 st.subheader("📈 Monthly Win Rate")
-monthly_win = df.groupby("month")["win"].mean() * 100
-fig = go.Figure([go.Scatter(x=monthly_win.index, y=monthly_win.values, mode="lines+markers")])
+monthly_win = chart(con, "monthly_win_rate", src)
+fig = go.Figure([go.Scatter(x=monthly_win["month"], y=monthly_win["win_rate"], mode="lines+markers")])
 fig.update_layout(yaxis_title="Win %")
 st.plotly_chart(fig, use_container_width=True)
 
 # Daily PnL
 st.subheader("💵 Daily PnL")
-daily_pnl = df.groupby("day")["pnl"].sum()
-fig = go.Figure([go.Bar(x=daily_pnl.index, y=daily_pnl.values)])
+daily_pnl = chart(con, "daily_pnl", src)
+fig = go.Figure([go.Bar(x=daily_pnl["day"], y=daily_pnl["pnl"])])
 st.plotly_chart(fig, use_container_width=True)
 
 # Weekday Performance
 st.subheader("📆 PnL by Weekday")
-weekday_pnl = df.groupby("weekday")["pnl"].mean().reindex([
-    "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"
-])
-fig = go.Figure([go.Bar(x=weekday_pnl.index, y=weekday_pnl.values)])
+weekday_pnl = chart(con, "weekday_pnl", src)
+fig = go.Figure([go.Bar(x=weekday_pnl["weekday"], y=weekday_pnl["pnl"])])
 st.plotly_chart(fig, use_container_width=True)
 
 # Hour of Day
 st.subheader("🕒 Hour of Day Performance")
-hour_pnl = df.groupby("hour")["pnl"].mean()
-fig = go.Figure([go.Bar(x=hour_pnl.index, y=hour_pnl.values)])
+hour_pnl = chart(con, "hour_pnl", src)
+fig = go.Figure([go.Bar(x=hour_pnl["hour"], y=hour_pnl["pnl"])])
 st.plotly_chart(fig, use_container_width=True)
 
 # Holding Time PnL
-if "holding_bucket" in df.columns:
+if "close_time" in src_columns:
     st.subheader("⏱️ PnL by Holding Time")
-    hold_pnl = df.groupby("holding_bucket")["pnl"].mean()
-    fig = go.Figure([go.Bar(x=hold_pnl.index.astype(str), y=hold_pnl.values)])
+    hold_pnl = chart(con, "holding_pnl", src)
+    fig = go.Figure([go.Bar(x=hold_pnl["holding_bucket"], y=hold_pnl["pnl"])])
     st.plotly_chart(fig, use_container_width=True)
 
 # Multi-symbol overlay
-if "symbol" in df.columns:
+if "symbol" in src_columns:
     st.subheader("📊 Multi-Symbol Equity Overlay")
+    equity = chart(con, "symbol_equity", src)
     fig_multi = go.Figure()
-    for sym in df["symbol"].unique():
-        temp = df[df["symbol"] == sym].copy()
-        temp["equity"] = temp["pnl"].cumsum()
+    for sym, temp in equity.groupby("symbol"):
         fig_multi.add_trace(go.Scatter(x=temp["timestamp"], y=temp["equity"], mode="lines", name=sym))
     fig_multi.update_layout(xaxis_title="Time", yaxis_title="Equity")
     st.plotly_chart(fig_multi, use_container_width=True)
 
+# Ad-hoc SQL
+st.subheader("🦆 Ad-hoc Query")
+with st.expander("Available tables"):
+    for label, view in sources.items():
+        st.markdown(f"- `{view}` ← {label}: {', '.join(columns(con, view))}")
+    st.markdown("- `backtests` ← all backtest files, plus a `source` column")
+sql = st.text_area(
+    "SQL (read-only)",
+    f"SELECT hour(timestamp) AS hour, count(*) AS trades, sum(pnl) AS pnl\nFROM {src}\nGROUP BY ALL ORDER BY hour",
+)
+if st.button("Run query"):
+    try:
+        st.dataframe(run_sql(con, sql), use_container_width=True)
+    except (ValueError, duckdb.Error) as e:
+        st.error(f"Query failed: {e}")
+
 # Full Log
 st.subheader("📄 Trade Log")
-st.dataframe(df.sort_values("timestamp", ascending=False).reset_index(drop=True))
+st.caption("Latest 1000 trades")
+st.dataframe(chart(con, "trade_log", src, limit=1000))
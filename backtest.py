@@ -0,0 +1,229 @@
+import argparse, calendar, itertools, json, os, sys, time
+from types import SimpleNamespace
+import pandas as pd
+import indicators, metrics as trade_metrics, strategies as strategy_registry
+from strategies import Bars, STRATEGIES, bars_needed
+from symbol_meta import SymbolMeta
+from metrics import summary_metrics
+from trade_record import COLUMNS, normalize
+from result_cache import ResultCache, make_key, code_version, file_fingerprint
+
+# 🧪 Bar-by-bar backtester for the registered strategies, on bar files saved
+# under bars/. Every strategy in a run shares one Bars object per bar (so a
+# parameter sweep costs about one pass), and each configuration's result is
+# stored in the result cache: re-running a configuration, from here or from
+# the dashboard, loads it instead of recomputing.
+#
+#   python backtest.py fetch EURUSD GBPUSD --count 50000 [--simulate]
+#   python backtest.py run --symbol EURUSD --strategy rsi --param buy_below=25,30,35
+
+BARS_DIR = "bars"
+TIMEFRAMES = {"M5": "TIMEFRAME_M5", "M15": "TIMEFRAME_M15", "H1": "TIMEFRAME_H1"}
+META_FIELDS = ["name", "point", "digits", "trade_contract_size", "trade_tick_size", "trade_tick_value",
+               "volume_min", "volume_max", "volume_step", "trade_stops_level", "filling_mode"]
+DEFAULTS = {"sl_pips": 10, "tp_pips": 20, "volume": 0.1, "max_hold": 96}
+
+
+def bars_path(symbol, timeframe="M15"):
+    return os.path.join(BARS_DIR, f"{symbol}_{timeframe}.parquet")
+
+
+def server_offset(mt5, symbol):
+    # Seconds MT5 server time (bar times) runs ahead of this machine's local
+    # clock (live trade timestamps). MT5_SERVER_OFFSET_HOURS overrides; else it
+    # is read off the latest tick, which only works while the market is open.
+    if os.getenv("MT5_SERVER_OFFSET_HOURS"):
+        return int(float(os.getenv("MT5_SERVER_OFFSET_HOURS")) * 3600)
+    tick = mt5.symbol_info_tick(symbol)
+    if tick is None:
+        return 0
+    offset = round((tick.time - calendar.timegm(time.localtime())) / 1800) * 1800
+    if abs(offset) > 14 * 3600:
+        print(f"⚠️ {symbol}: last tick is stale, assuming server time = local time (set MT5_SERVER_OFFSET_HOURS)")
+        return 0
+    return offset
+
+
+def fetch_bars(symbols, timeframe="M15", count=50_000, simulate=False):
+    # Saves rates + symbol specs, so backtests size P&L like the live bots
+    if simulate:
+        import sim_mt5 as mt5
+    else:
+        import MetaTrader5 as mt5
+    if not mt5.initialize():
+        raise SystemExit("❌ MT5 initialize failed")
+    os.makedirs(BARS_DIR, exist_ok=True)
+    try:
+        for symbol in symbols:
+            rates = mt5.copy_rates_from_pos(symbol, getattr(mt5, TIMEFRAMES[timeframe]), 0, count)
+            info = mt5.symbol_info(symbol)
+            if rates is None or info is None:
+                print(f"⚠️ No data for {symbol}")
+                continue
+            df = pd.DataFrame(rates)[["time", "open", "high", "low", "close"]]
+            df["time"] = pd.to_datetime(df["time"], unit="s")
+            path = bars_path(symbol, timeframe)
+            df.to_parquet(path, index=False)
+            with open(path.replace(".parquet", ".json"), "w", encoding="utf-8") as f:
+                json.dump({**{k: getattr(info, k) for k in META_FIELDS},
+                           "server_offset": server_offset(mt5, symbol)}, f)
+            print(f"💾 {path}: {len(df)} bars")
+    finally:
+        mt5.shutdown()
+
+
+def load_bars(path, start=None, end=None):
+    df = pd.read_parquet(path)
+    if start is not None:
+        df = df[df["time"] >= pd.Timestamp(start)]
+    if end is not None:
+        df = df[df["time"] < pd.Timestamp(end)]
+    return df.reset_index(drop=True)
+
+
+def load_meta(path):
+    with open(path.replace(".parquet", ".json"), encoding="utf-8") as f:
+        return SymbolMeta(None, SimpleNamespace(**json.load(f)))
+
+
+def load_server_offset(path):
+    # Seconds; files fetched before it was recorded count as local time
+    with open(path.replace(".parquet", ".json"), encoding="utf-8") as f:
+        return json.load(f).get("server_offset", 0)
+
+
+def first_exit(high, low, close, entry, side, sl, tp, max_hold):
+    # (exit index, exit price, reason) from the bars after `entry`. If a bar
+    # spans both levels the stop is assumed to hit first.
+    stop = min(entry + max_hold, len(close) - 1)
+    hi, lo = high[entry + 1:stop + 1], low[entry + 1:stop + 1]
+    hit_sl = lo <= sl if side == "buy" else hi >= sl
+    hit_tp = hi >= tp if side == "buy" else lo <= tp
+    i_sl = hit_sl.argmax() if hit_sl.any() else len(hi)
+    i_tp = hit_tp.argmax() if hit_tp.any() else len(hi)
+    if i_sl == len(hi) and i_tp == len(hi):
+        return stop, close[stop], "TIME"
+    if i_sl <= i_tp:
+        return entry + 1 + i_sl, sl, "SL"
+    return entry + 1 + i_tp, tp, "TP"
+
+
+def run_many(strategies, symbol, bars, meta, sl_pips, tp_pips, volume, max_hold):
+    # One pass over the bars for all strategies; one open position per strategy
+    closes = bars["close"].tolist()
+    high, low, close = bars["high"].to_numpy(), bars["low"].to_numpy(), bars["close"].to_numpy()
+    times = bars["time"].to_numpy()
+    window = bars_needed(strategies)
+    busy_until = [-1] * len(strategies)
+    rows = [[] for _ in strategies]
+    for i in range(window - 1, len(closes) - 1):
+        shared = Bars(symbol, closes[i - window + 1:i + 1])
+        for j, strategy in enumerate(strategies):
+            if i <= busy_until[j]:
+                continue
+            side = strategy.signal(shared)
+            if not side:
+                continue
+            sign = 1 if side == "buy" else -1
+            price = close[i]
+            sl = meta.round_price(price - sign * meta.stop_distance(sl_pips))
+            tp = meta.round_price(price + sign * meta.stop_distance(tp_pips))
+            k, exit_price, reason = first_exit(high, low, close, i, side, sl, tp, max_hold)
+            busy_until[j] = k
+            rows[j].append((times[i], times[k], symbol, side, volume, price, sl, tp, strategy.label,
+                            strategy.name, meta.pnl(price, exit_price, volume, side), exit_price, reason))
+    return [normalize(pd.DataFrame(r, columns=COLUMNS[:13])) for r in rows]
+
+
+def _metrics(trades):
+    return {k: float(v) for k, v in summary_metrics(trades).items()}
+
+
+def backtest(strategies, path, start=None, end=None, cache=None, **settings):
+    # [(strategy, trades, metrics, cached)]; only uncached configs are simulated
+    cache = cache or ResultCache()
+    settings = {**DEFAULTS, **settings}
+    symbol = os.path.basename(path).split("_")[0]
+    meta = load_meta(path)
+    data = [file_fingerprint(path), file_fingerprint(path.replace(".parquet", ".json")), str(start), str(end),
+            meta.pip]  # PIP_SIZES can be overridden from the environment
+    # The whole strategies module, so RSI_PERIOD or INDICATORS edits invalidate results too
+    engine = code_version(indicators, trade_metrics, strategy_registry, SymbolMeta, first_exit, run_many,
+                          normalize, _metrics)
+    keys = [make_key(code=[engine, code_version(type(s))], strategy=s.name, params=s.params,
+                     symbol=symbol, data=data, settings=settings) for s in strategies]
+
+    results = {}
+    for key, s in zip(keys, strategies):
+        hit = cache.get(key)
+        if hit is not None:
+            results[key] = (*hit, True)
+    todo = [(key, s) for key, s in zip(keys, strategies) if key not in results]
+    if todo:
+        bars = load_bars(path, start, end)
+        frames = run_many([s for _, s in todo], symbol, bars, meta, **settings)
+        for (key, s), trades in zip(todo, frames):
+            metrics = _metrics(trades)
+            cache.put(key, trades, metrics, strategy=s.name, params=s.params, symbol=symbol)
+            results[key] = (trades, metrics, False)
+        cache.evict()  # one pass over the cache folder per batch, not per entry
+    return [(s, *results[key]) for key, s in zip(keys, strategies)]
+
+
+def sweep(name, grid):
+    # grid = {param: [values]} -> one strategy instance per combination
+    cls = STRATEGIES[name]
+    names = list(grid)
+    return [cls(**dict(zip(names, combo))) for combo in itertools.product(*grid.values())] if grid else [cls()]
+
+
+def parse_grid(items):
+    # ["buy_below=25,30,35"] -> {"buy_below": [25, 30, 35]}
+    grid = {}
+    for item in items or []:
+        name, _, values = item.partition("=")
+        grid[name] = [json.loads(v) if v.replace(".", "", 1).lstrip("-").isdigit() else v
+                      for v in values.split(",")]
+    return grid
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backtest registered strategies on saved bars")
+    sub = parser.add_subparsers(dest="command", required=True)
+    fetch = sub.add_parser("fetch", help="save bars + symbol specs from MT5 (or the simulator)")
+    fetch.add_argument("symbols", nargs="+")
+    fetch.add_argument("--timeframe", default="M15", choices=list(TIMEFRAMES))
+    fetch.add_argument("--count", type=int, default=50_000)
+    fetch.add_argument("--simulate", action="store_true")
+    run = sub.add_parser("run", help="run (or load from cache) a strategy sweep")
+    run.add_argument("--symbol", required=True)
+    run.add_argument("--timeframe", default="M15", choices=list(TIMEFRAMES))
+    run.add_argument("--strategy", action="append", choices=list(STRATEGIES), required=True)
+    run.add_argument("--param", action="append", help="name=v1,v2,... (applies to strategies that have it)")
+    run.add_argument("--start")
+    run.add_argument("--end")
+    for name, value in DEFAULTS.items():
+        run.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value)
+    run.add_argument("--save", action="store_true", help="also write each result to backtests/*.csv")
+    args = parser.parse_args()
+
+    if args.command == "fetch":
+        fetch_bars(args.symbols, args.timeframe, args.count, args.simulate)
+        sys.exit(0)
+
+    grid = parse_grid(args.param)
+    strategies = [s for name in args.strategy
+                  for s in sweep(name, {k: v for k, v in grid.items() if k in STRATEGIES[name].PARAMS})]
+    started = time.perf_counter()
+    results = backtest(strategies, bars_path(args.symbol, args.timeframe), args.start, args.end,
+                       **{k: getattr(args, k) for k in DEFAULTS})
+    table = pd.DataFrame([{"strategy": s.name, **s.params, **m, "cached": hit} for s, _, m, hit in results])
+    print(table.round(2).to_string(index=False))
+    print(f"⏱️ {len(results)} configs in {time.perf_counter() - started:.2f}s "
+          f"({sum(hit for *_, hit in results)} from cache)")
+    if args.save:
+        for s, trades, _, _ in results:
+            suffix = "_".join(f"{k}{v}" for k, v in s.params.items())
+            out = os.path.join("backtests", f"{s.name}_{args.symbol}{'_' + suffix if suffix else ''}.csv")
+            trades.to_csv(out, index=False)
+            print(f"💾 {out}")
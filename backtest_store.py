@@ -0,0 +1,168 @@
+import os, glob
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+# 🧾 Explicit schema for backtest files. Categorical columns are stored as plain
+# strings in the Arrow schema (so row-group min/max stats stay usable for
+# pruning) but Parquet dictionary-encodes them on disk and we read them back as
+# dictionary arrays -> pandas categoricals.
+CATEGORY_COLUMNS = ["symbol", "strategy", "type", "comment"]
+SCHEMA = pa.schema([
+    ("timestamp", pa.timestamp("ms")),
+    ("close_time", pa.timestamp("ms")),
+    ("symbol", pa.string()),
+    ("type", pa.string()),
+    ("volume", pa.float64()),
+    ("price", pa.float64()),
+    ("sl", pa.float64()),
+    ("tp", pa.float64()),
+    ("comment", pa.string()),
+    ("strategy", pa.string()),
+    ("pnl", pa.float64()),
+])
+TIMESTAMP_FORMATS = [pacsv.ISO8601, "%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M"]
+# Rows are clustered by (symbol, strategy, timestamp) before writing, so small
+# row groups keep each one to a narrow slice of symbols/dates
+ROW_GROUP_SIZE = 50_000
+NUMBER = r"^[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?$"
+
+
+def parquet_path(csv_path):
+    return os.path.splitext(csv_path)[0] + ".parquet"
+
+
+def _to_float(col, type_):
+    # Like pd.to_numeric(errors="coerce"): a cell that isn't a number becomes null
+    try:
+        return col.cast(type_)
+    except pa.ArrowInvalid:
+        return pc.if_else(pc.match_substring_regex(col, NUMBER), col, None).cast(type_)
+
+
+def convert_csv(csv_path, out_path=None):
+    out_path = out_path or parquet_path(csv_path)
+    # Numbers are read as text and cast after, so one bad cell doesn't fail the file
+    floats = {f.name: f.type for f in SCHEMA if pa.types.is_floating(f.type)}
+    table = pacsv.read_csv(csv_path, convert_options=pacsv.ConvertOptions(
+        column_types={f.name: pa.string() if f.name in floats else f.type for f in SCHEMA},
+        timestamp_parsers=TIMESTAMP_FORMATS,
+        strings_can_be_null=True,
+    ))
+    for name, type_ in floats.items():
+        if name in table.column_names:
+            i = table.column_names.index(name)
+            table = table.set_column(i, name, _to_float(table[name], type_))
+    sort_keys = [c for c in ("symbol", "strategy", "timestamp") if c in table.column_names]
+    if sort_keys:
+        table = table.sort_by([(c, "ascending") for c in sort_keys])
+    pq.write_table(
+        table, out_path,
+        row_group_size=ROW_GROUP_SIZE,
+        use_dictionary=[c for c in CATEGORY_COLUMNS if c in table.column_names],
+        compression="zstd",
+        write_statistics=True,
+    )
+    return out_path
+
+
+def ingest(folder="backtests"):
+    # Convert any CSV whose Parquet copy is missing or older, return Parquet paths.
+    # A file that can't be converted (e.g. a bad timestamp) is reported and left out.
+    paths = []
+    for csv_path in sorted(glob.glob(f"{folder}/*.csv")):
+        out_path = parquet_path(csv_path)
+        if not os.path.exists(out_path) or os.path.getmtime(out_path) < os.path.getmtime(csv_path):
+            try:
+                convert_csv(csv_path, out_path)
+            except (pa.ArrowInvalid, OSError) as e:
+                print(f"⚠️ Skipping {csv_path}: {e}")
+                continue
+        paths.append(out_path)
+    return paths
+
+
+def distinct_values(path, columns=("symbol", "strategy", "type")):
+    # Only the dictionary-encoded columns are decoded, never prices/timestamps
+    names = pq.read_schema(path).names
+    columns = [c for c in columns if c in names]
+    pf = pq.ParquetFile(path, read_dictionary=columns)
+    table = pf.read(columns=columns)
+    return {c: sorted(pc.unique(table[c].combine_chunks().dictionary_decode()).drop_null().to_pylist())
+            for c in columns}
+
+
+def time_bounds(path, column="timestamp"):
+    # Min/max timestamp straight from row-group statistics
+    meta = pq.ParquetFile(path).metadata
+    idx = meta.schema.to_arrow_schema().get_field_index(column)
+    lo = hi = None
+    for i in range(meta.num_row_groups):
+        stats = meta.row_group(i).column(idx).statistics
+        if stats is None or not stats.has_min_max:
+            continue
+        lo = stats.min if lo is None else min(lo, stats.min)
+        hi = stats.max if hi is None else max(hi, stats.max)
+    return lo, hi
+
+
+def _row_group_matches(row_group, col_index, predicates):
+    for name, op, value in predicates:
+        stats = row_group.column(col_index[name]).statistics
+        if stats is None or not stats.has_min_max:
+            continue
+        if op == "in" and not any(stats.min <= v <= stats.max for v in value):
+            return False
+        if op == ">=" and stats.max < value:
+            return False
+        if op == "<=" and stats.min > value:
+            return False
+    return True
+
+
+def read_backtest(path, symbols=None, strategies=None, types=None, start=None, end=None, columns=None):
+    """Read a backtest Parquet file, decoding only row groups that can match.
+
+    `start`/`end` are inclusive datetimes on `timestamp`; None means no filter.
+    """
+    names = pq.read_schema(path).names
+    pf = pq.ParquetFile(path, read_dictionary=[c for c in CATEGORY_COLUMNS if c in names])
+    predicates = []
+    for name, values in (("symbol", symbols), ("strategy", strategies), ("type", types)):
+        if values is not None and name in names:
+            predicates.append((name, "in", [str(v) for v in values]))
+    if start is not None:
+        predicates.append(("timestamp", ">=", start))
+    if end is not None:
+        predicates.append(("timestamp", "<=", end))
+
+    col_index = {n: i for i, n in enumerate(names)}
+    meta = pf.metadata
+    row_groups = [i for i in range(meta.num_row_groups)
+                  if _row_group_matches(meta.row_group(i), col_index, predicates)]
+    read_columns = columns and sorted(set(columns) | {name for name, _, _ in predicates}, key=col_index.get)
+    table = pf.read_row_groups(row_groups, columns=read_columns)
+
+    # Exact row filter on the (already small) decoded groups
+    mask = None
+    for name, op, value in predicates:
+        col = table[name]
+        if op == "in":
+            cond = pc.is_in(col.cast(pa.string()), value_set=pa.array(value, pa.string()))
+        elif op == ">=":
+            cond = pc.greater_equal(col, pa.scalar(value, col.type))
+        else:
+            cond = pc.less_equal(col, pa.scalar(value, col.type))
+        mask = cond if mask is None else pc.and_(mask, cond)
+    if mask is not None:
+        table = table.filter(mask)
+    if columns:
+        table = table.select(columns)
+    return table.to_pandas()
+
+
+if __name__ == "__main__":
+    for p in ingest():
+        meta = pq.ParquetFile(p).metadata
+        print(f"✅ {p}: {meta.num_rows} rows, {meta.num_row_groups} row groups, {os.path.getsize(p)} bytes")
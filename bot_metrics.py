@@ -0,0 +1,195 @@
+import os, threading, time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# 📈 Minimal Prometheus-style metrics for the bots (stdlib only). Recording is a
+# dict lookup plus a few integer adds under an uncontended lock, so it is safe
+# to call on every MT5 request; the text format is only built when scraped.
+#
+#   curl http://127.0.0.1:9101/metrics
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+_registry = []
+
+
+def _fmt_labels(names, values, extra=""):
+    pairs = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._values)
+
+    def render(self, values=None):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        items = sorted((self.snapshot() if values is None else values).items())
+        for key, value in items:
+            lines.append(f"{self.name}{_fmt_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track_inprogress(self, **labels):
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # per-bucket counts (+Inf last), sum, count
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][i] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self):
+        with self._lock:
+            return {k: [list(v[0]), v[1], v[2]] for k, v in self._values.items()}
+
+    def render(self, values=None):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        items = sorted((self.snapshot() if values is None else values).items())
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + ("+Inf",), counts):
+                cumulative += n
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_fmt_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_fmt_labels(self.labelnames, key)} {total}")
+            lines.append(f"{self.name}_count{_fmt_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+def snapshot():
+    # Picklable copy of every metric, for sending to another process
+    return {m.name: m.snapshot() for m in _registry}
+
+
+def without_gauges(snap):
+    # For a process that has exited: its counts still add up, its gauges no longer hold
+    gauges = {m.name for m in _registry if m.kind == "gauge"}
+    return {name: values for name, values in snap.items() if name not in gauges}
+
+
+def _add(a, b):
+    if isinstance(a, list):  # histogram state
+        return [[x + y for x, y in zip(a[0], b[0])], a[1] + b[1], a[2] + b[2]]
+    return a + b
+
+
+def render_all(snapshots=None):
+    # Given snapshots (e.g. one per worker process), renders their sum instead
+    lines = []
+    for metric in _registry:
+        if snapshots is None:
+            lines += metric.render()
+            continue
+        values = {}
+        for snap in snapshots:
+            for key, value in snap.get(metric.name, {}).items():
+                values[key] = _add(values[key], value) if key in values else value
+        lines += metric.render(values)
+    return "\n".join(lines) + "\n"
+
+
+# 🤖 Metrics shared by both bots
+MT5_CALL_SECONDS = Histogram("mt5_call_seconds", "Latency of MetaTrader5 API calls", ["call"])
+CYCLE_SECONDS = Histogram("bot_cycle_seconds", "Duration of one signal-check cycle over all symbols")
+SIGNAL_TO_FILL_SECONDS = Histogram("bot_signal_to_fill_seconds", "Time from entry signal to filled order", ["symbol"])
+ORDER_RETCODES = Counter("bot_order_retcode_total", "order_send results by retcode", ["symbol", "retcode"])
+SKIPPED_SIGNALS = Counter("bot_skipped_signals_total", "Symbols skipped in a cycle", ["symbol", "reason"])
+ALERT_IN_PROGRESS = Gauge("bot_alerts_in_progress", "Alerts being sent right now")
+GIT_SYNC_IN_PROGRESS = Gauge("bot_git_syncs_in_progress", "Trade log git syncs running right now")
+ALERT_IN_PROGRESS.set(0)
+GIT_SYNC_IN_PROGRESS.set(0)
+
+
+def start_metrics_server(default_port, render=render_all):
+    # METRICS_PORT overrides the port, 0 disables the endpoint
+    port = int(os.getenv("METRICS_PORT", default_port))
+    if not port:
+        return None
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((os.getenv("METRICS_ADDR", "127.0.0.1"), port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True, name="metrics").start()
+    print(f"📈 Metrics on http://{server.server_address[0]}:{port}/metrics")
+    return server
@@ -0,0 +1,94 @@
+import ast, glob, subprocess, sys
+
+# ⏱️ Startup budget check. For every dashboard we collect the imports that run
+# before the login gate, for every bot its module-level imports, then time them
+# in a fresh interpreter with `python -X importtime`. Fails (exit 1) if a heavy
+# package sneaks back into startup or an entry point goes over its budget.
+#
+#   python check_startup.py            # report + check
+#   python check_startup.py --top 20   # show more of the slowest imports
+
+# Dashboards import these only after the login gate, so the login screen
+# renders without them. streamlit itself pulls in plotly and PIL, so those
+# aren't listed
+MUST_DEFER = {"pandas", "numpy", "pyarrow", "duckdb", "requests", "smtplib"}
+# Not installable off Windows, so it can't be timed here
+SKIP = {"MetaTrader5"}
+BUDGET_MS = {"dashboard": 1500, "bot": 200}
+BOTS = ["mt5_bot.py", "live_mt5_bot_with_trailing.py"]
+
+
+def _import_names(node):
+    if isinstance(node, ast.Import):
+        return [a.name for a in node.names]
+    if isinstance(node, ast.ImportFrom) and node.level == 0:
+        return [node.module]
+    return []
+
+
+def _is_login_gate(node):
+    # `if not st.session_state.authenticated:`
+    return isinstance(node, ast.If) and "authenticated" in ast.unparse(node.test)
+
+
+def startup_imports(path):
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    names = []
+    for node in tree.body:
+        if _is_login_gate(node):
+            break
+        names += _import_names(node)
+    return [n for n in dict.fromkeys(names) if n.split(".")[0] not in SKIP]
+
+
+def import_times(modules):
+    # {module: (self_us, cumulative_us)} for everything the imports pulled in
+    code = "; ".join(f"import {m}" for m in modules) or "pass"
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    times = {}
+    baseline = _interpreter_startup() if modules else set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|")
+        if name.strip() not in baseline:
+            times[name.strip()] = (int(self_us), int(cum_us))
+    return times
+
+
+def _interpreter_startup():
+    # Modules `site` loads before any of our code runs
+    return set(import_times([]))
+
+
+def check(path, kind, top=5):
+    modules = startup_imports(path)
+    times = import_times(modules)
+    total_ms = sum(times[m][1] for m in modules if m in times) / 1000
+    loaded = {name.split(".")[0] for name in times}
+    leaked = sorted(MUST_DEFER & loaded)
+    slowest = sorted(times.items(), key=lambda kv: kv[1][1], reverse=True)[:top]
+
+    ok = not leaked and total_ms <= BUDGET_MS[kind]
+    print(f"{'✅' if ok else '❌'} {path}: {total_ms:.0f} ms (budget {BUDGET_MS[kind]} ms)")
+    for name, (_, cum_us) in slowest:
+        print(f"    {cum_us / 1000:8.1f} ms  {name}")
+    if leaked:
+        print(f"    heavy modules at startup: {', '.join(leaked)}")
+    return ok
+
+
+def dashboards():
+    # Every script with a login gate
+    return [p for p in sorted(glob.glob("*.py"))
+            if any(_is_login_gate(n) for n in ast.parse(open(p, encoding="utf-8").read()).body)]
+
+
+if __name__ == "__main__":
+    top = int(sys.argv[sys.argv.index("--top") + 1]) if "--top" in sys.argv else 5
+    results = [check(p, "dashboard", top) for p in dashboards()] + [check(p, "bot", top) for p in BOTS]
+    sys.exit(0 if all(results) else 1)
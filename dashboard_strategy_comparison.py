@@ -1,7 +1,5 @@
 import streamlit as st
-import pandas as pd
-import plotly.graph_objs as go
-import os, glob
+import glob
 
 # 🛡️ Simple login check
 if "authenticated" not in st.session_state:
@@ -23,6 +21,13 @@ if not st.session_state.authenticated:
     login()
     st.stop()
 
+# 📦 Charts and metrics
+import pandas as pd
+import plotly.graph_objs as go
+from metrics import compute_metrics
+from trade_record import COLUMNS
+from shared_data import load_trades
+
 # 📊 Dashboard starts here
 st.set_page_config(page_title="📊 Strategy Comparison", layout="wide")
 st.title("📈 Strategy Equity Curve Comparison")
@@ -32,13 +37,10 @@ files = sorted(glob.glob("backtests/*.csv"))
 selected_file = st.sidebar.selectbox("📂 Choose Backtest File", ["Live"] + files)
 
 if selected_file != "Live":
-    df = pd.read_csv(selected_file, parse_dates=["timestamp", "close_time"])
+    df = load_trades(selected_file)
     st.info(f"📁 Viewing Backtest: {selected_file}")
 else:
-    df = pd.DataFrame(columns=[
-        "timestamp", "close_time", "symbol", "type", "volume",
-        "price", "sl", "tp", "comment", "strategy", "pnl"
-    ])
+    df = pd.DataFrame(columns=COLUMNS)
 
 if df.empty:
     st.warning("⚠️ No trade data available.")
@@ -58,6 +60,10 @@ if df.empty:
     st.warning("No data after filtering.")
     st.stop()
 
+# 📋 Stats per Strategy
+st.subheader("📋 Strategy Stats")
+st.dataframe(compute_metrics(df, by="strategy").round(2).reset_index(), use_container_width=True)
+
 # 📊 Equity Curve per Strategy
 st.subheader("📈 Equity Curves by Strategy")
 tabs = st.tabs(selected_strategies)
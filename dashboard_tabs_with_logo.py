@@ -1,11 +1,7 @@
 
 import streamlit as st
-import pandas as pd
-import plotly.graph_objs as go
 import os, glob
-from PIL import Image
-import streamlit as st
-import os
+from lazy_tabs import lazy_tabs, folder_version
 
 # Page config
 st.set_page_config(page_title="📊 MT5 Dashboard", layout="wide")
@@ -31,38 +27,45 @@ if not st.session_state.authenticated:
     login()
     st.stop()
 
-# === HEADER WITH LOGO ===
-col1, col2 = st.columns([1, 5])
-with col1:
-    st.image("https://upload.wikimedia.org/wikipedia/commons/0/0b/MT5_Logo.png", width=90)
-with col2:
-    st.title("📈 MT5 Strategy Dashboard")
-    st.caption("🚀 Powered by **Bandile's MT5 AI Bot**")
-
-# === TAB LAYOUT ===
-tabs = st.tabs(["📊 Live", "🧪 Backtests", "📈 Compare"])
+# 📦 Charts, metrics and the live feed
+import pandas as pd
+import plotly.graph_objs as go
+from metrics import compute_metrics
+from live_feed import live_feed, feed_available
+from shared_data import load_trades
 
-# === BACKTEST/LOGIC LOADER (shared) ===
-def load_file(path):
-    df = pd.read_csv(path, parse_dates=["timestamp"])
-    if "close_time" in df.columns:
-        df["close_time"] = pd.to_datetime(df["close_time"])
-    return df
+# === HEADER ===
+st.title("📈 MT5 Strategy Dashboard")
+st.caption("🚀 Powered by **Bandile's MT5 AI Bot**")
 
-def load_files_from_folder(folder="backtests"):
+# === BACKTEST/LOGIC LOADER (one shared copy per file version, see shared_data.py) ===
+def load_files_from_folder(folder="backtests", version=None):
     files = sorted(glob.glob(f"{folder}/*.csv"))
     data = {}
     for f in files:
         name = os.path.basename(f).replace(".csv", "")
-        data[name] = load_file(f)
+        data[name] = load_trades(f)
     return data
 
+@st.cache_data(show_spinner=False)
+def compare_stats(folder="backtests", version=None):
+    dfs = load_files_from_folder(folder, version)
+    if not dfs:
+        return None
+    combined = pd.concat(dfs.values(), keys=dfs.keys(), names=["file"]).reset_index(level=0)
+    return compute_metrics(combined, by="file").round(2).reset_index()
+
 # === TAB 1: LIVE ===
-with tabs[0]:
+def live_tab():
     st.subheader("📊 Live Trading Log")
+    if feed_available():
+        # Bots push fills here as they happen; the CSV is only the archive now
+        live_feed()
+        if not st.toggle("🗄️ Show archived trade_log.csv"):
+            return
     live_file = "trade_logs/trade_log.csv"
     if os.path.exists(live_file):
-        df = load_file(live_file)
+        df = load_trades(live_file)
         df["equity"] = df["pnl"].cumsum()
         st.line_chart(df.set_index("timestamp")["equity"])
         st.dataframe(df.tail(10), use_container_width=True)
@@ -70,19 +73,27 @@ with tabs[0]:
         st.warning("⚠️ No live trades found (trade_log.csv missing)")
 
 # === TAB 2: BACKTESTS ===
-with tabs[1]:
+def backtests_tab():
     st.subheader("🧪 Explore Uploaded Backtests")
     files = sorted(glob.glob("backtests/*.csv"))
     selected = st.selectbox("📂 Choose a backtest file", files)
-    df = load_file(selected)
+    if not selected:
+        st.warning("No backtest files found.")
+        return
+    df = load_trades(selected)
     df["equity"] = df["pnl"].cumsum()
     st.line_chart(df.set_index("timestamp")["equity"])
     st.dataframe(df.sort_values("timestamp", ascending=False), use_container_width=True)
 
 # === TAB 3: COMPARE STRATEGIES ===
-with tabs[2]:
+def compare_tab():
     st.subheader("📈 Strategy Equity Curve Comparison")
-    dfs = load_files_from_folder("backtests")
+    version = folder_version("backtests")
+    dfs = load_files_from_folder("backtests", version)
+    if not dfs:
+        st.warning("No backtest data found.")
+        return
+    st.dataframe(compare_stats("backtests", version), use_container_width=True)
     for name, df in dfs.items():
         df["equity"] = df["pnl"].cumsum()
         fig = go.Figure()
@@ -92,3 +103,7 @@ with tabs[2]:
         ))
         fig.update_layout(title=f"{name.upper()} Equity Curve", height=400)
         st.plotly_chart(fig, use_container_width=True)
+
+# === TAB LAYOUT (only the active view runs) ===
+views = {"📊 Live": live_tab, "🧪 Backtests": backtests_tab, "📈 Compare": compare_tab}
+views[lazy_tabs(list(views))]()
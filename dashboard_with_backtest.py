@@ -1,7 +1,5 @@
 import streamlit as st
-import pandas as pd
-import plotly.graph_objs as go
-import os, glob
+import os, glob, time
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -26,6 +24,15 @@ if not st.session_state.authenticated:
     login()
     st.stop()
 
+# 📦 Charts, metrics and the backtester
+import plotly.graph_objs as go
+from metrics import compute_metrics, summary_metrics
+from trade_record import EXIT_EMOJI
+from shared_data import load_trades
+from lazy_tabs import file_version, folder_version
+from backtest import BARS_DIR, TIMEFRAMES
+from whatif import ExitPaths
+
 # ──────────📂 LOAD CSV ──────────
 st.set_page_config(page_title="📊 MT5 Dashboard", layout="wide")
 st.title("📈 MT5 Strategy Dashboard")
@@ -34,44 +41,57 @@ st.sidebar.markdown("### 📂 Select File")
 files = sorted(glob.glob("backtests/*.csv"))
 selected = st.sidebar.selectbox("Select Backtest File", ["Live"] + files)
 
-def load_file(path):
-    try:
-        return pd.read_csv(path, parse_dates=["timestamp", "close_time"])
-    except:
-        return pd.read_csv(path, parse_dates=["timestamp"])
-
 if selected != "Live":
-    df = load_file(selected)
+    path = selected
+    df = load_trades(path)
     st.info(f"📁 Viewing Backtest: {selected}")
 else:
     path = "trade_logs/trade_log.csv"
     if not os.path.exists(path):
         st.warning("⚠️ No live trades found (trade_log.csv missing)")
         st.stop()
-    df = load_file(path)
+    df = load_trades(path)
 
 if df.empty:
     st.warning("No data")
     st.stop()
 
+# ──────────🔮 WHAT-IF EXITS ──────────
+st.sidebar.markdown("### 🔮 What-if Exits")
+whatif_tf = st.sidebar.selectbox("Bar timeframe", list(TIMEFRAMES), index=list(TIMEFRAMES).index("M15"))
+whatif_hold = st.sidebar.number_input("Max hold (bars)", 1, 2000, 96)
+whatif_sl = st.sidebar.slider("SL (pips)", 1, 100, 10)
+whatif_tp = st.sidebar.slider("TP (pips)", 1, 200, 20)
+whatif_trigger = st.sidebar.slider("Trail trigger (pips, 0 = off)", 0, 100, 5)
+whatif_offset = st.sidebar.slider("Trail offset (pips)", 1, 50, 3)
+
+@st.cache_resource(show_spinner="Building price paths...", max_entries=8)
+def exit_paths(path, version, timeframe, horizon, bars_version, local_time):
+    # Built once per trade file/bars version; slider changes only re-simulate
+    paths = ExitPaths(load_trades(path), timeframe, horizon, local_time)
+    return paths, summary_metrics(paths.trades)
+
 # ──────────📊 METRICS ──────────
 st.subheader("📊 Performance Metrics")
-total_pnl = df["pnl"].sum()
-buy_pnl = df[df["type"] == "buy"]["pnl"].sum()
-sell_pnl = df[df["type"] == "sell"]["pnl"].sum()
+overall = summary_metrics(df)
+by_type = compute_metrics(df, by="type")["Total_PnL"]
 col1, col2, col3 = st.columns(3)
-col1.metric("Total PnL", f"{total_pnl:.2f}")
-col2.metric("Buy PnL", f"{buy_pnl:.2f}")
-col3.metric("Sell PnL", f"{sell_pnl:.2f}")
+col1.metric("Total PnL", f"{overall['Total_PnL']:.2f}")
+col2.metric("Buy PnL", f"{by_type.get('buy', 0.0):.2f}")
+col3.metric("Sell PnL", f"{by_type.get('sell', 0.0):.2f}")
+col4, col5, col6 = st.columns(3)
+col4.metric("Profit Factor", f"{overall['Profit_Factor']:.2f}")
+col5.metric("Sharpe (per trade)", f"{overall['Sharpe']:.2f}")
+col6.metric("Max Drawdown", f"{overall['Max_Drawdown']:.2f}")
 
 # 🧠 Exit reason tracking
-if "exit_reason" in df.columns:
-    reason_counts = df["exit_reason"].value_counts()
+if df["exit_reason"].ne("").any():
+    reason_counts = df.loc[df["exit_reason"] != "", "exit_reason"].value_counts()
     with st.expander("📌 Exit Reason Summary"):
         st.dataframe(reason_counts)
 
-# 🎯 Trailing stop stats
-if "trailing_hit" in df.columns:
+# 🎯 Trailing stop stats (only the live log records trailing)
+if selected == "Live":
     hit_rate = df["trailing_hit"].mean() * 100
     st.metric("🎯 Trailing Stop Hit Rate", f"{hit_rate:.1f}%")
 
@@ -83,11 +103,36 @@ fig.add_trace(go.Scatter(x=df["timestamp"], y=df["equity"], mode="lines+markers"
 fig.update_layout(title="Equity Over Time", xaxis_title="Time", yaxis_title="Equity")
 st.plotly_chart(fig, use_container_width=True)
 
+# 🔮 Same entries, re-simulated with the sidebar's exits against stored bars
+st.subheader("🔮 What-if Exits")
+# The live log is in the bot's local time, backtests are in bar (server) time
+paths, logged = exit_paths(path, file_version(path), whatif_tf, whatif_hold, folder_version(BARS_DIR, "*.parquet"),
+                           local_time=selected == "Live")
+if not paths.n:
+    st.info(f"No stored {whatif_tf} bars for these trades. Fetch them with: "
+            f"python backtest.py fetch {' '.join(df['symbol'].unique())} --timeframe {whatif_tf}")
+else:
+    started = time.perf_counter()
+    sim = paths.simulate(whatif_sl, whatif_tp, whatif_trigger, whatif_offset)
+    what_if = summary_metrics(sim)
+    elapsed = (time.perf_counter() - started) * 1000
+    col1, col2, col3, col4 = st.columns(4)
+    for col, name in zip((col1, col2, col3, col4), ("Total_PnL", "Win_Rate", "Profit_Factor", "Max_Drawdown")):
+        col.metric(name.replace("_", " "), f"{what_if[name]:.2f}", f"{what_if[name] - logged[name]:+.2f} vs logged")
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=paths.trades["timestamp"], y=paths.trades["pnl"].cumsum(), mode="lines", name="Logged"))
+    fig.add_trace(go.Scatter(x=sim["timestamp"], y=sim["pnl"].cumsum(), mode="lines", name="What-if"))
+    fig.update_layout(title="Equity: Logged vs What-if", xaxis_title="Time", yaxis_title="Equity")
+    st.plotly_chart(fig, use_container_width=True)
+    with st.expander("📌 What-if Exit Reasons"):
+        st.dataframe(sim["exit_reason"].value_counts())
+    st.caption(f"{paths.n} of {len(df)} trades re-simulated in {elapsed:.0f} ms")
+
 # 🎯 Exit emoji table
-if "exit_emoji" in df.columns:
-    df["exit_display"] = df["exit_emoji"] + " " + df["exit_reason"]
+df["exit_display"] = (df["exit_reason"].map(EXIT_EMOJI).fillna("") + " " + df["exit_reason"]).str.strip()
 
 # 📄 Raw log
+RAW_LOG_ROWS = 5000
 st.subheader("📄 Raw Trade Log")
 color_map = {
     "TP": "#d4edda",
@@ -100,5 +145,6 @@ def highlight_row(row):
     color = color_map.get(reason, "")
     return ["background-color: " + color] * len(row)
 
-styled = df.sort_values("timestamp", ascending=False).style.apply(highlight_row, axis=1)
+# Newest rows only: Styler refuses very large frames
+styled = df.sort_values("timestamp", ascending=False).head(RAW_LOG_ROWS).style.apply(highlight_row, axis=1)
 st.dataframe(styled, use_container_width=True)
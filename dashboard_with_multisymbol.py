@@ -1,7 +1,5 @@
 import streamlit as st
-import pandas as pd
-import plotly.graph_objs as go
-import os, glob
+from datetime import datetime, time as dt_time
 
 if "authenticated" not in st.session_state:
     st.session_state.authenticated = False
@@ -22,40 +20,57 @@ if not st.session_state.authenticated:
     login()
     st.stop()
 
+# 📦 Charts and the Parquet backtest store
+import plotly.graph_objs as go
+from backtest_store import ingest, distinct_values, time_bounds, read_backtest
+from metrics import compute_metrics
+
 st.set_page_config(page_title="📊 Dashboard", layout="wide")
 st.title("📈 MT5 Strategy Dashboard with Multi-Symbol Support")
 
-# Load CSV files
-files = sorted(glob.glob("backtests/*.csv"))
+# Load backtests (CSV ingested to Parquet on first use)
+files = ingest("backtests")
 selected = st.sidebar.selectbox("📂 Backtest", ["Live"] + files)
 
-if selected != "Live":
-    df = pd.read_csv(selected, parse_dates=["timestamp", "close_time"])
-    st.info(f"📁 Backtest file: {selected}")
-else:
-    df = pd.DataFrame(columns=["timestamp","close_time","symbol","type","volume","price","sl","tp","comment","strategy","pnl"])
-
-if df.empty:
+if selected == "Live":
     st.warning("No data found.")
     st.stop()
 
-# Sidebar filters
-symbols = df['symbol'].unique().tolist()
-strategies = df['strategy'].unique().tolist()
-types = df['type'].unique().tolist()
+st.info(f"📁 Backtest file: {selected}")
 
-selected_symbols = st.sidebar.multiselect("🪙 Symbols", symbols, default=symbols)
-selected_strategies = st.sidebar.multiselect("📈 Strategies", strategies, default=strategies)
-selected_types = st.sidebar.multiselect("🧾 Trade Types", types, default=types)
+# Sidebar filters: options come from the dictionary columns and row-group stats only
+options = distinct_values(selected)
+lo, hi = time_bounds(selected)
+if lo is None:
+    st.warning("No data found.")
+    st.stop()
 
-df = df[df['symbol'].isin(selected_symbols)]
-df = df[df['strategy'].isin(selected_strategies)]
-df = df[df['type'].isin(selected_types)]
+selected_symbols = st.sidebar.multiselect("🪙 Symbols", options["symbol"], default=options["symbol"])
+selected_strategies = st.sidebar.multiselect("📈 Strategies", options["strategy"], default=options["strategy"])
+selected_types = st.sidebar.multiselect("🧾 Trade Types", options["type"], default=options["type"])
+date_range = st.sidebar.date_input("📅 Date Range", (lo.date(), hi.date()),
+                                   min_value=lo.date(), max_value=hi.date())
+# While a range is being picked only the first date is set
+start_date, end_date = date_range if len(date_range) == 2 else (date_range[0], date_range[0])
+
+# Filters are pushed down into the Parquet read
+df = read_backtest(
+    selected,
+    symbols=selected_symbols,
+    strategies=selected_strategies,
+    types=selected_types,
+    start=datetime.combine(start_date, dt_time.min),
+    end=datetime.combine(end_date, dt_time.max),
+)
 
 if df.empty:
     st.warning("No trades after filtering.")
     st.stop()
 
+# Stats per symbol
+st.subheader("📋 Symbol Stats")
+st.dataframe(compute_metrics(df, by="symbol").round(2).reset_index(), use_container_width=True)
+
 # Equity curves per symbol
 st.subheader("📊 Equity Curves by Symbol")
 tabs = st.tabs(selected_symbols)
@@ -1,7 +1,5 @@
 import streamlit as st
-import pandas as pd
-import plotly.graph_objs as go
-import os, glob
+import glob
 
 if "authenticated" not in st.session_state:
     st.session_state.authenticated = False
@@ -22,6 +20,13 @@ if not st.session_state.authenticated:
     login()
     st.stop()
 
+# 📦 Charts and metrics
+import pandas as pd
+import plotly.graph_objs as go
+from metrics import summary_metrics
+from trade_record import COLUMNS
+from shared_data import load_trades
+
 st.set_page_config(page_title="📊 Dashboard", layout="wide")
 st.title("📈 MT5 Dashboard")
 
@@ -29,15 +34,21 @@ files = sorted(glob.glob("backtests/*.csv"))
 selected = st.sidebar.selectbox("📂 Backtest", ["Live"] + files)
 
 if selected != "Live":
-    df = pd.read_csv(selected, parse_dates=["timestamp", "close_time"])
+    df = load_trades(selected)
     st.info(f"Backtest: {selected}")
 else:
-    df = pd.DataFrame(columns=["timestamp","close_time","symbol","type","volume","price","sl","tp","comment","strategy","pnl"])
+    df = pd.DataFrame(columns=COLUMNS)
 
 if df.empty:
     st.warning("No data")
     st.stop()
 
+overall = summary_metrics(df)
+col1, col2, col3 = st.columns(3)
+col1.metric("Total PnL", f"{overall['Total_PnL']:.2f}")
+col2.metric("Win Rate", f"{overall['Win_Rate']:.2f}%")
+col3.metric("Max Drawdown", f"{overall['Max_Drawdown']:.2f}")
+
 df["equity"] = df["pnl"].cumsum()
 fig = go.Figure()
 fig.add_trace(go.Scatter(x=df["timestamp"], y=df["equity"], mode="lines+markers"))
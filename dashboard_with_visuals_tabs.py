@@ -1,7 +1,6 @@
 import streamlit as st
-import pandas as pd
-import plotly.graph_objs as go
 import os, glob
+from lazy_tabs import lazy_tabs, file_version, folder_version
 
 st.set_page_config(page_title="📊 MT5 Strategy Lab", layout="wide")
 
@@ -24,32 +23,75 @@ if not st.session_state.authenticated:
     login()
     st.stop()
 
-# --- File loaders ---
-def load_file(path):
-    df = pd.read_csv(path, parse_dates=["timestamp"])
-    if "close_time" in df.columns:
-        df["close_time"] = pd.to_datetime(df["close_time"])
-    return df
-
-def load_backtests(folder="backtests"):
+# 📦 Charts, metrics, traces and the live feed
+import pandas as pd
+import plotly.graph_objs as go
+from metrics import compute_metrics
+from tracing import read_trace, TRACE_DIR
+from shared_data import load_trades
+from live_feed import live_feed, feed_available
+from strategies import STRATEGIES
+from backtest import backtest, sweep, parse_grid, DEFAULTS, BARS_DIR
+
+# --- File loaders (one shared copy per file version, see shared_data.py) ---
+def load_backtests(folder="backtests", version=None):
     files = sorted(glob.glob(f"{folder}/*.csv"))
     data = {}
     for f in files:
         name = os.path.basename(f).replace(".csv", "")
-        df = load_file(f)
+        df = load_trades(f)
         data[name] = df
     return data
 
-# --- Tabs ---
-tab1, tab2, tab3 = st.tabs(["📊 Live", "🧪 Backtests", "📈 Compare"])
+@st.cache_data(show_spinner=False)
+def comparison_tables(folder="backtests", version=None):
+    dfs = load_backtests(folder, version)
+    if not dfs:
+        return None
+    # File name is the strategy label; drop the in-file column so reset_index doesn't collide
+    combined = pd.concat([d.drop(columns="strategy", errors="ignore") for d in dfs.values()],
+                         keys=dfs.keys(), names=["strategy"])
+    combined = combined.reset_index(level=0)
+    combined["win"] = combined["pnl"] > 0
+    combined["month"] = combined["timestamp"].dt.to_period("M").astype(str)
+    combined["date"] = combined["timestamp"].dt.date
 
-with tab1:
+    win_rate = combined.groupby(["strategy", "month"])["win"].mean().reset_index()
+    win_rate["win"] = (win_rate["win"] * 100).round(1)
+    daily_pnl = combined.groupby(["strategy", "date"])["pnl"].sum().reset_index()
+    equity = combined.sort_values(["strategy", "timestamp"], kind="stable")[["strategy", "timestamp", "pnl"]]
+    equity["equity"] = equity.groupby("strategy")["pnl"].cumsum()
+    stats = compute_metrics(combined, by="strategy")
+    return win_rate, daily_pnl, equity, stats
+
+@st.cache_data(show_spinner=False)
+def load_traces(files):
+    # files: ((path, mtime_ns), ...) so an appended or rotated trace reloads
+    rows = []
+    for path, _ in files:
+        bot = os.path.basename(path).split(".")[0].replace("trace_", "")
+        for e in read_trace(path):
+            args = e.get("args", {})
+            rows.append((bot, args.get("cycle"), e["name"], args.get("path", e["name"]),
+                         e["ts"], e["dur"] / 1000))
+    if not rows:
+        return None
+    df = pd.DataFrame(rows, columns=["bot", "cycle", "name", "path", "ts", "dur_ms"])
+    return df.sort_values("ts", kind="stable")
+
+# --- Views (only the active one runs) ---
+def live_tab():
     st.header("📊 Live Trading Log")
+    if feed_available():
+        # Bots push fills here as they happen; the CSV is only the archive now
+        live_feed()
+        if not st.toggle("🗄️ Show archived trade_log.csv"):
+            return
     live_path = "trade_logs/trade_log.csv"
     if not os.path.exists(live_path):
         st.warning("⚠️ No live trades found (trade_log.csv missing)")
     else:
-        df = load_file(live_path)
+        df = load_trades(live_path)
         df["equity"] = df["pnl"].cumsum()
         fig = go.Figure()
         fig.add_trace(go.Scatter(x=df["timestamp"], y=df["equity"], mode="lines+markers"))
@@ -57,12 +99,12 @@ with tab1:
         st.plotly_chart(fig, use_container_width=True)
         st.dataframe(df.tail(20))
 
-with tab2:
+def backtests_tab():
     st.header("🧪 Backtest Explorer")
     backtest_files = sorted(glob.glob("backtests/*.csv"))
     selected = st.selectbox("Choose a backtest", backtest_files)
     if selected:
-        df = load_file(selected)
+        df = load_trades(selected)
         df["equity"] = df["pnl"].cumsum()
         st.subheader(f"Equity Curve: {os.path.basename(selected)}")
         fig = go.Figure()
@@ -70,24 +112,19 @@ with tab2:
         fig.update_layout(title="Backtest Equity", xaxis_title="Time", yaxis_title="Equity")
         st.plotly_chart(fig, use_container_width=True)
         st.dataframe(df.tail(20))
+    else:
+        st.warning("No backtest files found.")
 
-with tab3:
+def compare_tab():
     st.header("📈 Strategy Comparison Dashboard")
-    dfs = load_backtests()
-    if not dfs:
+    tables = comparison_tables("backtests", folder_version("backtests"))
+    if tables is None:
         st.warning("No backtest data found.")
-        st.stop()
-
-    combined = pd.concat(dfs.values(), keys=dfs.keys(), names=["strategy"])
-    combined = combined.reset_index(level=0)
-    combined["win"] = combined["pnl"] > 0
-    combined["month"] = combined["timestamp"].dt.to_period("M").astype(str)
-    combined["date"] = combined["timestamp"].dt.date
+        return
+    win_rate, daily_pnl, equity, stats = tables
 
     # --- Win Rate ---
     st.subheader("📉 Win Rate Trend (Monthly)")
-    win_rate = combined.groupby(["strategy", "month"])["win"].mean().reset_index()
-    win_rate["win"] = (win_rate["win"] * 100).round(1)
     for strat in win_rate["strategy"].unique():
         subset = win_rate[win_rate["strategy"] == strat]
         fig = go.Figure()
@@ -97,7 +134,6 @@ with tab3:
 
     # --- Daily PnL ---
     st.subheader("📊 Daily PnL (Bar Chart)")
-    daily_pnl = combined.groupby(["strategy", "date"])["pnl"].sum().reset_index()
     for strat in daily_pnl["strategy"].unique():
         dfp = daily_pnl[daily_pnl["strategy"] == strat]
         fig = go.Figure()
@@ -108,38 +144,107 @@ with tab3:
     # --- Equity Overlay ---
     st.subheader("📍 Multi-Strategy Equity Overlay")
     fig = go.Figure()
-    for strat, df in dfs.items():
-        df = df.sort_values("timestamp")
-        df["equity"] = df["pnl"].cumsum()
+    for strat, df in equity.groupby("strategy", sort=False):
         fig.add_trace(go.Scatter(x=df["timestamp"], y=df["equity"], mode="lines", name=strat))
     fig.update_layout(title="Equity Comparison", xaxis_title="Time", yaxis_title="Equity")
     st.plotly_chart(fig, use_container_width=True)
 
     # --- Strategy Stats Table ---
     st.subheader("📊 Summary Stats")
-    stats = combined.groupby("strategy").agg(
-        Trades=("pnl", "count"),
-        Total_PnL=("pnl", "sum"),
-        Avg_PnL=("pnl", "mean"),
-        Win_Rate=("win", "mean"),
-    ).reset_index()
-    stats["Win_Rate"] = (stats["Win_Rate"] * 100).round(2)
-    st.dataframe(stats)
+    st.dataframe(stats.round(2).reset_index())
 
     # --- Max Loss Streak ---
     st.subheader("🔥 Max Loss Streak")
-    for strat, df in combined.groupby("strategy"):
-        streak = 0
-        max_streak = 0
-        for p in df["pnl"]:
-            if p <= 0:
-                streak += 1
-                max_streak = max(max_streak, streak)
-            else:
-                streak = 0
+    for strat, max_streak in stats["Max_Loss_Streak"].items():
         st.markdown(f"- **{strat}**: {max_streak} losses in a row")
 
-    # --- Sidebar Footer ---
-    st.sidebar.markdown("---")
-    st.sidebar.markdown("👤 Built by **Bandile Sihle**")
-    st.sidebar.markdown("🔁 Auto-refresh supported")
+def traces_tab():
+    st.header("⏱️ Bot Cycle Traces")
+    pattern = os.path.join(TRACE_DIR, "trace_*.json*")
+    files = tuple((f, file_version(f)) for f in sorted(glob.glob(pattern)))
+    df = load_traces(files) if files else None
+    if df is None:
+        st.warning(f"No traces yet ({pattern}). Bots sample TRACE_SAMPLE_RATE of their cycles.")
+        return
+
+    bot = st.selectbox("Bot", sorted(df["bot"].unique()))
+    df = df[df["bot"] == bot]
+    cycles = df.loc[df["name"] == "cycle"].sort_values("ts")["cycle"]
+    if cycles.empty:
+        st.warning(f"No complete cycles traced for {bot} yet.")
+        return
+    last_n = st.number_input("Recent cycles", 1, len(cycles), min(len(cycles), 50))
+    df = df[df["cycle"].isin(cycles.tail(last_n))]
+
+    # --- Per-stage latency ---
+    st.subheader("📋 Stage Latency (ms)")
+    stages = df.groupby("path")["dur_ms"].agg(
+        calls="count", p50="median", p99=lambda d: d.quantile(0.99), max="max", total="sum")
+    cycle_total = df.loc[df["name"] == "cycle", "dur_ms"].sum()
+    stages["% of cycle"] = 100 * stages["total"] / cycle_total if cycle_total else 0
+    st.dataframe(stages.sort_values("total", ascending=False).round(2))
+
+    # --- Flame summary: where the time goes, by call path ---
+    st.subheader("🔥 Time by Call Path")
+    totals = stages["total"]
+    parents = [p.rpartition("/")[0] for p in totals.index]
+    fig = go.Figure(go.Icicle(
+        ids=totals.index, labels=[p.rpartition("/")[2] for p in totals.index],
+        parents=parents, values=totals.values, branchvalues="total",
+    ))
+    fig.update_layout(margin=dict(t=10, l=10, r=10, b=10), height=400)
+    st.plotly_chart(fig, use_container_width=True)
+
+    # --- Timeline of one cycle ---
+    st.subheader("🕒 Cycle Timeline")
+    chosen = st.selectbox("Cycle", cycles.tail(last_n).iloc[::-1])
+    spans = df[df["cycle"] == chosen]
+    start = spans["ts"].min()
+    fig = go.Figure(go.Bar(
+        y=spans["path"], x=spans["dur_ms"], base=(spans["ts"] - start) / 1000,
+        orientation="h", hovertemplate="%{y}<br>%{x:.2f} ms<extra></extra>",
+    ))
+    fig.update_layout(xaxis_title="ms since cycle start", yaxis=dict(autorange="reversed"),
+                      height=max(300, 22 * len(spans)))
+    st.plotly_chart(fig, use_container_width=True)
+
+def sweep_tab():
+    st.header("🔁 Strategy Sweep")
+    bar_files = sorted(glob.glob(f"{BARS_DIR}/*.parquet"))
+    if not bar_files:
+        st.warning("No bar data yet. Run: python backtest.py fetch EURUSD --simulate")
+        return
+    path = st.selectbox("Bars", bar_files, format_func=os.path.basename)
+    names = st.multiselect("Strategies", list(STRATEGIES), default=list(STRATEGIES)[:1])
+    grid_text = st.text_input("Parameter grid", "buy_below=25,30,35", help="name=v1,v2; name=v1,v2")
+    cols = st.columns(len(DEFAULTS))
+    settings = {k: col.number_input(k, value=v) for col, (k, v) in zip(cols, DEFAULTS.items())}
+    if not names:
+        return
+
+    # Same result cache as the CLI: configs anyone has already run load instantly
+    grid = parse_grid([g.strip() for g in grid_text.split(";") if g.strip()])
+    strategies = [s for name in names
+                  for s in sweep(name, {k: v for k, v in grid.items() if k in STRATEGIES[name].PARAMS})]
+    with st.spinner(f"Running {len(strategies)} configs..."):
+        results = backtest(strategies, path, **settings)
+    st.caption(f"{sum(hit for *_, hit in results)} of {len(results)} configs from the result cache")
+
+    labels = [" ".join([s.name, *(f"{k}={v}" for k, v in s.params.items())]) for s, *_ in results]
+    st.subheader("📊 Summary Stats")
+    st.dataframe(pd.DataFrame([m for _, _, m, _ in results], index=labels).round(2))
+    st.subheader("📍 Equity by Config")
+    fig = go.Figure()
+    for label, (_, trades, _, _) in zip(labels, results):
+        fig.add_trace(go.Scatter(x=trades["close_time"], y=trades["pnl"].cumsum(), mode="lines", name=label))
+    fig.update_layout(title="Sweep Equity", xaxis_title="Time", yaxis_title="Equity")
+    st.plotly_chart(fig, use_container_width=True)
+
+views = {"📊 Live": live_tab, "🧪 Backtests": backtests_tab, "📈 Compare": compare_tab,
+         "🔁 Sweep": sweep_tab, "⏱️ Traces": traces_tab}
+views[lazy_tabs(list(views))]()
+
+# --- Sidebar Footer ---
+st.sidebar.markdown("---")
+st.sidebar.markdown("👤 Built by **Bandile Sihle**")
+st.sidebar.markdown("🔁 Auto-refresh supported")
@@ -0,0 +1,105 @@
+import json, os, threading, time
+
+# 📡 Local event stream from the bots to the dashboards: an append-only SQLite
+# table in WAL mode, so one bot (or every supervisor shard) writes while any
+# number of dashboards read without blocking. Readers keep the last event id
+# they saw and only fetch newer rows, so a poll is one indexed range scan and
+# fill-to-chart latency is the dashboard's poll interval, not a git push.
+# trade_log.csv and its git sync stay as the archive.
+#
+# Event kinds: trade, position, equity, decision (payload is free-form JSON).
+
+EVENT_DB = os.getenv("EVENT_DB", os.path.join("logs", "events.db"))
+RETENTION_SECONDS = int(os.getenv("EVENT_RETENTION_SECONDS", 7 * 24 * 3600))
+KINDS = ("trade", "position", "equity", "decision")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    bot TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    symbol TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_kind_id ON events (kind, id);
+"""
+
+
+def _connect(path):
+    # sqlite3 is imported here so the bots' startup doesn't pay for it
+    import sqlite3
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    con = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA synchronous=NORMAL")  # durable enough for a feed; the CSV is the record
+    con.executescript(SCHEMA)
+    return con
+
+
+class EventPublisher:
+    def __init__(self, bot, path=EVENT_DB):
+        self.bot = bot
+        self.path = path
+        self._con = None
+        self._lock = threading.Lock()
+        self._published = 0
+
+    def publish(self, kind, symbol=None, **data):
+        # Never lets a feed problem interrupt trading
+        try:
+            with self._lock:
+                if self._con is None:
+                    self._con = _connect(self.path)
+                self._con.execute(
+                    "INSERT INTO events (ts, bot, kind, symbol, data) VALUES (?, ?, ?, ?, ?)",
+                    (time.time(), self.bot, kind, symbol, json.dumps(data, default=str)),
+                )
+                self._published += 1
+                if self._published % 1000 == 0:
+                    self._con.execute("DELETE FROM events WHERE ts < ?", (time.time() - RETENTION_SECONDS,))
+        except Exception as e:
+            print(f"⚠️ Event publish failed ({kind}):", e)
+            self._con = None
+
+
+class EventSubscriber:
+    def __init__(self, path=EVENT_DB, kinds=KINDS, backlog=500):
+        # Starts with up to `backlog` recent events per kind, then only new ones
+        self.path = path
+        self.kinds = tuple(kinds)
+        self.backlog = backlog
+        self.cursor = None
+        self._con = None
+
+    def available(self):
+        return os.path.exists(self.path)
+
+    def poll(self, limit=5000):
+        if self._con is None:
+            if not self.available():
+                return []
+            self._con = _connect(self.path)
+        marks = ",".join("?" * len(self.kinds))
+        if self.cursor is None:
+            self.cursor = self._con.execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()[0]
+            rows = []
+            for kind in self.kinds:
+                rows += self._con.execute(
+                    "SELECT id, ts, bot, kind, symbol, data FROM events WHERE kind = ? AND id <= ? "
+                    "ORDER BY id DESC LIMIT ?",
+                    (kind, self.cursor, self.backlog),
+                ).fetchall()
+            rows.sort()
+        else:
+            rows = self._con.execute(
+                f"SELECT id, ts, bot, kind, symbol, data FROM events WHERE id > ? AND kind IN ({marks}) "
+                "ORDER BY id LIMIT ?",
+                (self.cursor, *self.kinds, limit),
+            ).fetchall()
+            if rows:
+                self.cursor = rows[-1][0]
+        return [
+            {"id": i, "ts": ts, "bot": bot, "kind": kind, "symbol": symbol, **json.loads(data)}
+            for i, ts, bot, kind, symbol, data in rows
+        ]
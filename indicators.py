@@ -0,0 +1,40 @@
+import math
+
+# 📐 Plain-Python indicators for the bots. The bots only look at the last ~100
+# M5/M15 closes, where a loop is faster than importing pandas at startup.
+
+
+def sma(values, period):
+    if len(values) < period:
+        return math.nan
+    return sum(values[-period:]) / period
+
+
+def ema_series(values, span):
+    # Same as pandas .ewm(span=span, adjust=False).mean()
+    alpha = 2 / (span + 1)
+    out = []
+    for v in values:
+        out.append(v if not out else alpha * v + (1 - alpha) * out[-1])
+    return out
+
+
+def rsi(closes, period=14):
+    # Simple-mean (Cutler) RSI over the last `period` price changes
+    if len(closes) < period + 1:
+        return math.nan
+    window = closes[-(period + 1):]
+    deltas = [b - a for a, b in zip(window, window[1:])]
+    gain = sum(d for d in deltas if d > 0) / period
+    loss = sum(-d for d in deltas if d < 0) / period
+    if loss == 0:
+        return 100.0 if gain > 0 else math.nan
+    return 100 - 100 / (1 + gain / loss)
+
+
+def macd(closes, fast=12, slow=26, signal=9):
+    # Returns (macd line, signal line) as full series
+    fast_ema = ema_series(closes, fast)
+    slow_ema = ema_series(closes, slow)
+    line = [f - s for f, s in zip(fast_ema, slow_ema)]
+    return line, ema_series(line, signal)
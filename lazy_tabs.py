@@ -0,0 +1,19 @@
+import os, glob
+import streamlit as st
+
+# 🗂️ st.tabs() executes every tab body on each rerun, even hidden ones. This
+# selector looks like a tab bar but only the active view's code runs; the
+# other views do no loading until they are opened.
+
+
+def lazy_tabs(labels, key="active_view"):
+    return st.radio("View", labels, horizontal=True, key=key, label_visibility="collapsed")
+
+
+def file_version(path):
+    # Extra cache-key argument so st.cache_data reloads a file after it is rewritten
+    return os.stat(path).st_mtime_ns
+
+
+def folder_version(folder, pattern="*.csv"):
+    return tuple((f, file_version(f)) for f in sorted(glob.glob(os.path.join(folder, pattern))))
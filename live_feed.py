@@ -0,0 +1,92 @@
+import time
+from collections import deque
+import pandas as pd
+import plotly.graph_objs as go
+import streamlit as st
+from event_stream import EventSubscriber, EVENT_DB
+
+# 📡 Live panel fed by the bots' event stream (event_stream.py). Runs as a
+# fragment that polls every POLL_SECONDS: only rows newer than the session's
+# cursor are fetched and appended, and only this panel reruns, not the page.
+
+POLL_SECONDS = 0.5
+MAX_TRADES = 1000
+MAX_EQUITY_POINTS = 5000
+MAX_DECISIONS = 200
+
+
+def _feed_state(path):
+    key = f"live_feed:{path}"
+    if key not in st.session_state:
+        st.session_state[key] = {
+            "sub": EventSubscriber(path),
+            "trades": deque(maxlen=MAX_TRADES),
+            "equity": deque(maxlen=MAX_EQUITY_POINTS),
+            "decisions": deque(maxlen=MAX_DECISIONS),
+            "positions": {},
+            "last_ts": None,
+        }
+    return st.session_state[key]
+
+
+def _apply(state, events):
+    for e in events:
+        kind = e["kind"]
+        if kind == "trade":
+            state["trades"].append(e)
+        elif kind == "equity":
+            state["equity"].append(e)
+        elif kind == "decision":
+            state["decisions"].append(e)
+        elif kind == "position":
+            key = (e["bot"], e["symbol"])
+            if e.get("status") == "closed":
+                state["positions"].pop(key, None)
+            else:
+                state["positions"][key] = e
+        state["last_ts"] = e["ts"]
+
+
+def feed_available(path=EVENT_DB):
+    return EventSubscriber(path).available()
+
+
+@st.fragment(run_every=POLL_SECONDS)
+def live_feed(path=EVENT_DB):
+    state = _feed_state(path)
+    _apply(state, state["sub"].poll())
+
+    trades = pd.DataFrame(list(state["trades"]))
+    age = time.time() - state["last_ts"] if state["last_ts"] else None
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Equity", f"{state['equity'][-1]['equity']:,.2f}" if state["equity"] else "–")
+    col2.metric("Trades (feed)", len(trades))
+    col3.metric("Open Positions", len(state["positions"]))
+    col4.metric("Last Event", f"{age:.1f}s ago" if age is not None else "–")
+
+    if state["equity"]:
+        equity = pd.DataFrame(list(state["equity"]))
+        equity["time"] = pd.to_datetime(equity["ts"], unit="s")
+        fig = go.Figure()
+        for bot, df in equity.groupby("bot", sort=False):
+            fig.add_trace(go.Scatter(x=df["time"], y=df["equity"], mode="lines", name=bot))
+        fig.update_layout(title="Live Equity", xaxis_title="Time", yaxis_title="Equity", height=320)
+        st.plotly_chart(fig, use_container_width=True)
+
+    if len(trades):
+        trades["time"] = pd.to_datetime(trades["ts"], unit="s")
+        trades["cum_pnl"] = trades["pnl"].astype(float).cumsum()
+        fig = go.Figure(go.Scatter(x=trades["time"], y=trades["cum_pnl"], mode="lines+markers"))
+        fig.update_layout(title="Cumulative PnL (fills)", xaxis_title="Time", yaxis_title="PnL", height=320)
+        st.plotly_chart(fig, use_container_width=True)
+        st.dataframe(trades.drop(columns=["id", "ts", "kind"]).tail(20).iloc[::-1], use_container_width=True)
+
+    if state["positions"]:
+        st.markdown("**📌 Open Positions**")
+        st.dataframe(pd.DataFrame(state["positions"].values()).drop(columns=["id", "kind"]),
+                     use_container_width=True)
+    if state["decisions"]:
+        st.markdown("**🧠 Latest Decisions**")
+        decisions = pd.DataFrame(list(state["decisions"])[-20:][::-1])
+        decisions["time"] = pd.to_datetime(decisions["ts"], unit="s")
+        st.dataframe(decisions.drop(columns=["id", "ts", "kind"]), use_container_width=True)
@@ -1,10 +1,16 @@
 import MetaTrader5 as mt5
 import time, os, subprocess
 from datetime import datetime
-import pandas as pd
-from email.message import EmailMessage
-import smtplib, requests
 from dotenv import load_dotenv
+from strategies import Bars, RSI_PERIOD, load, bars_needed, evaluate
+from bot_metrics import (
+    start_metrics_server, MT5_CALL_SECONDS, CYCLE_SECONDS, SIGNAL_TO_FILL_SECONDS,
+    ORDER_RETCODES, SKIPPED_SIGNALS, ALERT_IN_PROGRESS, GIT_SYNC_IN_PROGRESS,
+)
+from tracing import Tracer, trace_path
+from symbol_meta import SymbolCache
+from event_stream import EventPublisher
+from trade_record import TradeRecord, append_csv
 
 # Load environment variables
 load_dotenv()
@@ -19,22 +25,33 @@ SYMBOLS = ["EURUSD", "GBPUSD", "BTCUSD"]
 VOLUME = 0.1
 SL_PIPS = 10
 TP_PIPS = 10
-RSI_PERIOD = 14
-RSI_THRESHOLD = 30
+RSI_THRESHOLD = int(os.getenv("RSI_THRESHOLD", 30))
 TRAIL_TRIGGER_PIPS = 5
 TRAIL_OFFSET_PIPS = 3
+# This bot only opens longs; any strategy that says "buy" on the shared bars trades
+STRATEGY_NAMES = os.getenv("STRATEGIES", "rsi").split(",")
+BOT_STRATEGIES = load(STRATEGY_NAMES, {"rsi": {"buy_below": RSI_THRESHOLD}})
+TRAIL_WAIT_SECONDS = float(os.getenv("TRAIL_WAIT_SECONDS", 5))
 
 log_dir = os.path.join(REPO_PATH, "trade_logs")
-os.makedirs(log_dir, exist_ok=True)
 log_file = os.path.join(log_dir, "trade_log.csv")
+SYMBOL_META = SymbolCache(mt5)
+EVENTS = EventPublisher("live_mt5_bot_with_trailing", os.getenv("EVENT_DB", os.path.join(REPO_PATH, "logs", "events.db")))
+TRACER = Tracer(trace_path("live_mt5_bot_with_trailing", REPO_PATH))
 
-if not os.path.exists(log_file):
-    pd.DataFrame(columns=[
-        "timestamp", "close_time", "symbol", "type", "volume", "price", "sl", "tp",
-        "pnl", "holding_time", "comment", "strategy", "trailing_hit", "adjusted_sl"
-    ]).to_csv(log_file, index=False)
+def log_trade(*logs):
+    # Append rows instead of re-reading and rewriting the whole log
+    os.makedirs(log_dir, exist_ok=True)
+    append_csv(log_file, logs)
 
 def send_alert(subject, body):
+    # smtplib/requests are only imported when an alert actually goes out
+    with ALERT_IN_PROGRESS.track_inprogress():
+        _send_alert(subject, body)
+
+def _send_alert(subject, body):
+    import smtplib, requests
+    from email.message import EmailMessage
     try:
         msg = EmailMessage()
         msg.set_content(body)
@@ -55,6 +72,10 @@ def send_alert(subject, body):
         print("Telegram failed:", e)
 
 def sync_to_github():
+    with GIT_SYNC_IN_PROGRESS.track_inprogress():
+        _sync_to_github()
+
+def _sync_to_github():
     try:
         os.chdir(REPO_PATH)
         subprocess.run(["git", "add", "trade_logs/trade_log.csv"], check=True)
@@ -64,106 +85,130 @@ def sync_to_github():
     except Exception as e:
         print("❌ Git push failed:", e)
 
-def get_rsi(symbol, period=14):
-    rates = mt5.copy_rates_from_pos(symbol, mt5.TIMEFRAME_M5, 0, period + 1)
-    if rates is None or len(rates) < period + 1:
+def get_bars(symbol):
+    count = bars_needed(BOT_STRATEGIES)
+    with TRACER.span("fetch_rates"), MT5_CALL_SECONDS.time(call="copy_rates_from_pos"):
+        rates = mt5.copy_rates_from_pos(symbol, mt5.TIMEFRAME_M5, 0, count)
+    if rates is None or len(rates) < count:
         return None
-    df = pd.DataFrame(rates)
-    delta = df['close'].diff()
-    gain = delta.where(delta > 0, 0).rolling(period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(period).mean()
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
-    return rsi.iloc[-1]
+    return Bars(symbol, [float(c) for c in rates['close']])
 
 def trade(symbol):
-    rsi = get_rsi(symbol, RSI_PERIOD)
-    if rsi is None:
+    # One symbol's signal check; returns the log row if an order filled
+    bars = get_bars(symbol)
+    if bars is None:
         print(f"⚠️ Not enough data for {symbol}")
+        SKIPPED_SIGNALS.inc(symbol=symbol, reason="no_data")
+        EVENTS.publish("decision", symbol, action="skip", reason="no_data")
         return
+    with TRACER.span("indicators"):
+        rsi = bars.get("rsi", RSI_PERIOD)
+    with TRACER.span("strategies"):
+        buys = [s for s, side in evaluate(BOT_STRATEGIES, bars) if side == "buy"]
     print(f"📊 {symbol} RSI: {rsi:.2f}")
-    if rsi > RSI_THRESHOLD:
-        print(f"⏸️ Skipping {symbol} (RSI too high)")
+    if not buys:
+        print(f"⏸️ Skipping {symbol} (no buy signal)")
+        SKIPPED_SIGNALS.inc(symbol=symbol, reason="no_signal")
+        EVENTS.publish("decision", symbol, action="skip", reason="no_signal", rsi=rsi)
         return
+    strategy = buys[0]
+    signal_time = time.perf_counter()
 
-    tick = mt5.symbol_info_tick(symbol)
+    with TRACER.span("symbol_info_tick"), MT5_CALL_SECONDS.time(call="symbol_info_tick"):
+        tick = mt5.symbol_info_tick(symbol)
     if tick is None:
         print(f"❌ Symbol not found: {symbol}")
+        SKIPPED_SIGNALS.inc(symbol=symbol, reason="no_tick")
+        EVENTS.publish("decision", symbol, action="skip", reason="no_tick", rsi=rsi)
         return
 
     price = tick.ask
-    sl = price - SL_PIPS * 0.0001
-    tp = price + TP_PIPS * 0.0001
-
-    request = {
-        "action": mt5.TRADE_ACTION_DEAL,
-        "symbol": symbol,
-        "volume": VOLUME,
-        "type": mt5.ORDER_TYPE_BUY,
-        "price": price,
-        "sl": sl,
-        "tp": tp,
-        "deviation": 10,
-        "magic": 123456,
-        "comment": "RSI entry",
-        "type_time": mt5.ORDER_TIME_GTC,
-        "type_filling": mt5.ORDER_FILLING_IOC
-    }
-
-    result = mt5.order_send(request)
+    request, reason = SYMBOL_META.market_order(symbol, "buy", VOLUME, price, SL_PIPS, TP_PIPS,
+                                               magic=123456, comment="RSI entry")
+    if request is None:
+        # Would be rejected by the broker anyway; skip the round trip
+        print(f"🚫 {symbol} order failed local checks: {reason}")
+        SKIPPED_SIGNALS.inc(symbol=symbol, reason=reason)
+        EVENTS.publish("decision", symbol, action="skip", reason=reason, rsi=rsi, price=price)
+        return
+    meta = SYMBOL_META.get(symbol)
+    sl, tp, volume = request["sl"], request["tp"], request["volume"]
+    EVENTS.publish("decision", symbol, action="buy", reason="signal", strategy=strategy.name,
+                   fired=[s.name for s in buys], rsi=rsi, price=price)
+
+    with TRACER.span("order_send"), MT5_CALL_SECONDS.time(call="order_send"):
+        result = mt5.order_send(request)
+    ORDER_RETCODES.inc(symbol=symbol, retcode=result.retcode)
     if result.retcode == mt5.TRADE_RETCODE_DONE:
+        SIGNAL_TO_FILL_SECONDS.observe(time.perf_counter() - signal_time, symbol=symbol)
         print(f"✅ {symbol} BUY trade placed")
         entry_time = datetime.now()
         trailing_hit = False
         adjusted_sl = sl
+        EVENTS.publish("position", symbol, status="open", side="buy", volume=volume, price=price, sl=sl, tp=tp)
 
-        time.sleep(5)
-        new_price = mt5.symbol_info_tick(symbol).bid
-        diff = (new_price - price) * 10000
+        with TRACER.span("trail_wait"):
+            time.sleep(TRAIL_WAIT_SECONDS)
+            with MT5_CALL_SECONDS.time(call="symbol_info_tick"):
+                new_price = mt5.symbol_info_tick(symbol).bid
+        diff = meta.pips(new_price - price)
 
         if diff >= TRAIL_TRIGGER_PIPS:
-            adjusted_sl = price + (diff - TRAIL_OFFSET_PIPS) * 0.0001
+            adjusted_sl = meta.round_price(price + (diff - TRAIL_OFFSET_PIPS) * meta.pip)
             trailing_hit = True
+            EVENTS.publish("position", symbol, status="open", side="buy", volume=volume, price=price,
+                           sl=adjusted_sl, tp=tp)
 
-        pnl = (new_price - price) * 100000 * VOLUME
+        pnl = meta.pnl(price, new_price, volume)
         hold_secs = (datetime.now() - entry_time).total_seconds()
 
-        log = {
-            "timestamp": entry_time,
-            "close_time": datetime.now(),
-            "symbol": symbol,
-            "type": "buy",
-            "volume": VOLUME,
-            "price": price,
-            "sl": sl,
-            "tp": tp,
-            "pnl": pnl,
-            "holding_time": hold_secs,
-            "comment": "RSI < 30",
-            "strategy": "rsi",
-            "trailing_hit": trailing_hit,
-            "adjusted_sl": adjusted_sl
-        }
-
-        df = pd.read_csv(log_file)
-        df = pd.concat([df, pd.DataFrame([log])], ignore_index=True)
-        df.to_csv(log_file, index=False)
-
-        send_alert(f"{symbol} Trade Executed", f"BUY @ {price:.5f} | PnL: {pnl:.2f} | Trailing SL: {'✅' if trailing_hit else '❌'}")
-        sync_to_github()
+        log = TradeRecord(
+            timestamp=entry_time,
+            close_time=datetime.now(),
+            symbol=symbol,
+            type="buy",
+            volume=volume,
+            price=price,
+            sl=sl,
+            tp=tp,
+            pnl=pnl,
+            close_price=new_price,
+            holding_time=hold_secs,
+            comment=strategy.label,
+            strategy=strategy.name,
+            trailing_hit=trailing_hit,
+            adjusted_sl=adjusted_sl,
+        )
+        EVENTS.publish("trade", **log)
+        EVENTS.publish("position", symbol, status="closed", side="buy", price=new_price, pnl=pnl)
+        with TRACER.span("alert"):
+            send_alert(f"{symbol} Trade Executed", f"BUY @ {price:.5f} | PnL: {pnl:.2f} | Trailing SL: {'✅' if trailing_hit else '❌'}")
+        return log
     else:
         print(f"❌ {symbol} trade failed: {result.retcode}")
+        EVENTS.publish("decision", symbol, action="skip", reason=f"retcode_{result.retcode}", rsi=rsi, price=price)
 
 # 🔁 Main Loop
 if __name__ == "__main__":
     if not mt5.initialize():
         print("❌ Failed to connect to MT5")
         quit()
+    start_metrics_server(9102)
     try:
         while True:
             print(f"\n🕒 {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Checking signals")
-            for sym in SYMBOLS:
-                trade(sym)
+            with CYCLE_SECONDS.time(), TRACER.cycle():
+                for sym in SYMBOLS:
+                    with TRACER.span("trade", symbol=sym):
+                        log = trade(sym)
+                        if log:
+                            with TRACER.span("csv_write"):
+                                log_trade(log)
+                            with TRACER.span("git_sync"):
+                                sync_to_github()
+            account = mt5.account_info()
+            if account is not None:
+                EVENTS.publish("equity", balance=account.balance, equity=account.equity)
             print("💤 Sleeping for 10 mins...\n")
             time.sleep(600)
     except KeyboardInterrupt:
@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+
+# 📐 Column order of every metrics table
+METRIC_COLUMNS = [
+    "Trades", "Total_PnL", "Avg_PnL", "Win_Rate", "Avg_Win", "Avg_Loss",
+    "Profit_Factor", "Expectancy", "Sharpe", "Sortino",
+    "Max_Drawdown", "Max_DD_Duration", "Max_Win_Streak", "Max_Loss_Streak",
+]
+
+
+def _longest_run(flag, codes, starts):
+    # Longest run of True per group. `flag`/`codes` are sorted by group, `starts`
+    # holds the first row of each group.
+    n = len(flag)
+    new_run = np.empty(n, dtype=bool)
+    new_run[0] = True
+    new_run[1:] = (flag[1:] != flag[:-1]) | (codes[1:] != codes[:-1])
+    run_id = np.cumsum(new_run) - 1
+    run_len = np.bincount(run_id)
+    run_len = np.where(flag[new_run], run_len, 0)
+    # Runs never cross a group boundary, so each group's runs are contiguous
+    run_starts = run_id[starts]
+    return np.maximum.reduceat(run_len, run_starts)
+
+
+def compute_metrics(df, by=None, pnl_col="pnl", time_col="timestamp"):
+    """Per-group performance stats for a trade frame in one vectorized pass.
+
+    `by` is a column name or list of names (None = whole frame as "All").
+    Sharpe/Sortino are per trade (not annualized); drawdown is measured on the
+    cumulative PnL curve starting from 0 and its duration is in trades.
+    """
+    cols = [pnl_col] + ([time_col] if time_col in df.columns else [])
+    keys = [] if by is None else ([by] if isinstance(by, str) else list(by))
+    data = df[keys + cols].copy()
+    data[pnl_col] = pd.to_numeric(data[pnl_col], errors="coerce")
+    data = data.dropna(subset=[pnl_col])
+
+    if data.empty:
+        index = pd.Index([], name=keys[0]) if len(keys) == 1 else None
+        return pd.DataFrame(columns=METRIC_COLUMNS, index=index)
+
+    if keys:
+        grouped = data.groupby(keys, sort=True, observed=True, dropna=False)
+        codes = grouped.ngroup().to_numpy()
+        index = grouped.size().index
+    else:
+        codes = np.zeros(len(data), dtype=np.int64)
+        index = pd.Index(["All"])
+    n_groups = len(index)
+
+    # Chronological order within each group (stable, so file order breaks ties)
+    if time_col in data.columns:
+        t = pd.to_datetime(data[time_col], errors="coerce").to_numpy(dtype="datetime64[ns]").view("i8")
+        order = np.lexsort((t, codes))
+    else:
+        order = np.argsort(codes, kind="stable")
+    codes = codes[order]
+    pnl = data[pnl_col].to_numpy(dtype=float)[order]
+
+    count = np.bincount(codes, minlength=n_groups).astype(float)
+    starts = np.concatenate(([0], np.cumsum(count)[:-1])).astype(np.int64)
+
+    win = pnl > 0
+    loss = pnl < 0
+    total = np.bincount(codes, pnl, n_groups)
+    wins = np.bincount(codes, win, n_groups)
+    gross_profit = np.bincount(codes, np.where(win, pnl, 0.0), n_groups)
+    gross_loss = -np.bincount(codes, np.where(loss, pnl, 0.0), n_groups)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = total / count
+        win_rate = wins / count
+        avg_win = gross_profit / wins
+        avg_loss = -gross_loss / (count - wins)
+        profit_factor = np.where(gross_loss > 0, gross_profit / gross_loss,
+                                 np.where(gross_profit > 0, np.inf, np.nan))
+        expectancy = win_rate * np.nan_to_num(avg_win) + (1 - win_rate) * np.nan_to_num(avg_loss)
+
+        dev = pnl - mean[codes]
+        std = np.sqrt(np.bincount(codes, dev * dev, n_groups) / (count - 1))
+        downside = np.sqrt(np.bincount(codes, np.minimum(pnl, 0.0) ** 2, n_groups) / count)
+        sharpe = np.where(std > 0, mean / std, np.nan)
+        sortino = np.where(downside > 0, mean / downside, np.nan)
+
+    # Equity curve per group: global cumsum minus the running total before each group
+    csum = np.cumsum(pnl)
+    offset = np.concatenate(([0.0], csum))[starts]
+    equity = csum - offset[codes]
+    peak = np.maximum(pd.Series(equity).groupby(codes).cummax().to_numpy(), 0.0)
+    drawdown = equity - peak
+    max_dd = np.minimum.reduceat(drawdown, starts)
+
+    stats = pd.DataFrame({
+        "Trades": count.astype(np.int64),
+        "Total_PnL": total,
+        "Avg_PnL": mean,
+        "Win_Rate": win_rate * 100,
+        "Avg_Win": avg_win,
+        "Avg_Loss": avg_loss,
+        "Profit_Factor": profit_factor,
+        "Expectancy": expectancy,
+        "Sharpe": sharpe,
+        "Sortino": sortino,
+        "Max_Drawdown": max_dd,
+        "Max_DD_Duration": _longest_run(drawdown < 0, codes, starts),
+        "Max_Win_Streak": _longest_run(win, codes, starts),
+        # Same rule as the old per-row loop: a flat trade extends a loss streak
+        "Max_Loss_Streak": _longest_run(~win, codes, starts),
+    }, index=index)
+    return stats
+
+
+def summary_metrics(df, pnl_col="pnl", time_col="timestamp"):
+    # Whole-frame stats as a Series, handy for st.metric cards
+    stats = compute_metrics(df, pnl_col=pnl_col, time_col=time_col)
+    if stats.empty:
+        return pd.Series(0, index=METRIC_COLUMNS, dtype=float)
+    return stats.iloc[0]
@@ -1,10 +1,16 @@
 import MetaTrader5 as mt5
-import pandas as pd
 import time, os
 from datetime import datetime
-from email.message import EmailMessage
-import smtplib, requests
 from dotenv import load_dotenv
+from strategies import Bars, RSI_PERIOD, load, bars_needed, evaluate
+from bot_metrics import (
+    start_metrics_server, MT5_CALL_SECONDS, CYCLE_SECONDS, SIGNAL_TO_FILL_SECONDS,
+    ORDER_RETCODES, SKIPPED_SIGNALS, ALERT_IN_PROGRESS, GIT_SYNC_IN_PROGRESS,
+)
+from tracing import Tracer, trace_path
+from symbol_meta import SymbolCache
+from event_stream import EventPublisher
+from trade_record import TradeRecord, append_csv, append_rows
 load_dotenv()
 EMAIL = os.getenv("EMAIL_SENDER")
 EMAIL_PASS = os.getenv("EMAIL_PASSWORD")
@@ -19,88 +25,120 @@ equity = 10000  # Example starting equity
 max_drawdown_pct = 0.1  # 10%
 lowest_equity = equity
 symbol_rsi_threshold = {
-"EURUSD": 40,
-"GBPUSD": 42
+    "EURUSD": 40,
+    "GBPUSD": 42
+}
+SYMBOLS = list(symbol_rsi_threshold)
+VOLUME = 0.1
+SL_PIPS = 10
+TP_PIPS = 20
+# STRATEGIES=rsi_macd_sma,macd,... runs several strategies on the same bars;
+# the first one that fires on a symbol takes the trade
+STRATEGY_NAMES = os.getenv("STRATEGIES", "rsi_macd_sma").split(",")
+symbol_strategies = {
+    symbol: load(STRATEGY_NAMES, {"rsi_macd_sma": {"buy_below": threshold}})
+    for symbol, threshold in symbol_rsi_threshold.items()
 }
-──────────────────────────────
-📤 Alert function (Email + Telegram)
-──────────────────────────────
+SYMBOL_META = SymbolCache(mt5)
+EVENTS = EventPublisher("mt5_bot")
+TRACER = Tracer(trace_path("mt5_bot", GIT_REPO_PATH or "."))
+# ──────────────────────────────
+# 📤 Alert function (Email + Telegram)
+# ──────────────────────────────
 def send_alert(subject, body):
-try:
-msg = EmailMessage()
-msg.set_content(body)
-msg["Subject"] = subject
-msg["From"] = EMAIL
-msg["To"] = EMAIL
-with smtplib.SMTP("smtp.gmail.com", 587) as server:
-server.starttls()
-server.login(EMAIL, EMAIL_PASS)
-server.send_message(msg)
-except Exception as e:
-print("Email failed:", e)
-try:
-requests.post(
-f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage",
-data={"chat_id": TELEGRAM_CHAT_ID, "text": body},
-)
-except Exception as e:
-print("Telegram failed:", e)
-──────────────────────────────
-💾 Log trade to CSV
-──────────────────────────────
-def log_trade(trade):
-os.makedirs("trade_logs", exist_ok=True)
-path = "trade_logs/trade_log.csv"
-df = pd.DataFrame([trade])
-df.to_csv(path, mode="a", index=False, header=not os.path.exists(path))
+    # smtplib/requests are only imported when an alert actually goes out
+    with ALERT_IN_PROGRESS.track_inprogress():
+        _send_alert(subject, body)
+def _send_alert(subject, body):
+    import smtplib, requests
+    from email.message import EmailMessage
+    try:
+        msg = EmailMessage()
+        msg.set_content(body)
+        msg["Subject"] = subject
+        msg["From"] = EMAIL
+        msg["To"] = EMAIL
+        with smtplib.SMTP("smtp.gmail.com", 587) as server:
+            server.starttls()
+            server.login(EMAIL, EMAIL_PASS)
+            server.send_message(msg)
+    except Exception as e:
+        print("Email failed:", e)
+    try:
+        requests.post(
+            f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage",
+            data={"chat_id": TELEGRAM_CHAT_ID, "text": body},
+        )
+    except Exception as e:
+        print("Telegram failed:", e)
+# ──────────────────────────────
+# 💾 Log trade to CSV
+# ──────────────────────────────
+def log_trade(*trades):
+    os.makedirs("trade_logs", exist_ok=True)
+    append_csv("trade_logs/trade_log.csv", trades)
 def log_skipped(symbol, rsi):
-os.makedirs("logs", exist_ok=True)
-path = "logs/skipped_signals.csv"
-record = pd.DataFrame([{"timestamp": datetime.now(), "symbol": symbol, "reason": f"RSI too high: {rsi:.2f}"}])
-record.to_csv(path, mode="a", index=False, header=not os.path.exists(path))
-──────────────────────────────
-🔁 Git Auto-Push Function
-──────────────────────────────
+    os.makedirs("logs", exist_ok=True)
+    append_rows("logs/skipped_signals.csv", ("timestamp", "symbol", "reason"),
+                [(datetime.now(), symbol, f"RSI too high: {rsi:.2f}")])
+# ──────────────────────────────
+# 🔁 Git Auto-Push Function
+# ──────────────────────────────
 def git_push_log():
-os.chdir(GIT_REPO_PATH)
-os.system(f"git config user.email "{GIT_EMAIL}"")
-os.system(f"git config user.name "{GIT_USERNAME}"")
-os.system("git add trade_logs/trade_log.csv")
-msg = f"Auto-log trade at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-os.system(f"git commit -m "{msg}"")
-os.system("git push")
-──────────────────────────────
-🤖 RSI + MACD + SMA Strategy Trading Loop
-──────────────────────────────
+    with GIT_SYNC_IN_PROGRESS.track_inprogress():
+        _git_push_log()
+def _git_push_log():
+    os.chdir(GIT_REPO_PATH)
+    os.system(f'git config user.email "{GIT_EMAIL}"')
+    os.system(f'git config user.name "{GIT_USERNAME}"')
+    os.system("git add trade_logs/trade_log.csv")
+    msg = f"Auto-log trade at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+    os.system(f'git commit -m "{msg}"')
+    os.system("git push")
+# ──────────────────────────────
+# 🤖 RSI + MACD + SMA Strategy Trading Loop
+# ──────────────────────────────
 def trade():
-global equity, lowest_equity
-if not mt5.initialize():
-    print("MT5 failed")
-    return
+    if not mt5.initialize():
+        print("MT5 failed")
+        return
 
-for symbol in ["EURUSD", "GBPUSD"]:
-    rates = mt5.copy_rates_from_pos(symbol, mt5.TIMEFRAME_M15, 0, 100)
+    for symbol in SYMBOLS:
+        with TRACER.span("trade", symbol=symbol):
+            record = trade_symbol(symbol)
+            if record:
+                with TRACER.span("csv_write"):
+                    log_trade(record)
+                with TRACER.span("git_sync"):
+                    git_push_log()
+
+    account = mt5.account_info()
+    if account is not None:
+        EVENTS.publish("equity", balance=account.balance, equity=account.equity)
+    mt5.shutdown()
+
+def trade_symbol(symbol):
+    # One symbol's signal check; returns the trade record if an order filled
+    global equity, lowest_equity
+    strategies = symbol_strategies[symbol]
+    with TRACER.span("fetch_rates"), MT5_CALL_SECONDS.time(call="copy_rates_from_pos"):
+        rates = mt5.copy_rates_from_pos(symbol, mt5.TIMEFRAME_M15, 0, max(100, bars_needed(strategies)))
     if rates is None or len(rates) < 50:
         print(f"⚠️ Not enough data for {symbol}")
-        continue
+        SKIPPED_SIGNALS.inc(symbol=symbol, reason="no_data")
+        EVENTS.publish("decision", symbol, action="skip", reason="no_data")
+        return
 
-    df = pd.DataFrame(rates)
-    df['rsi'] = pd.Series(df['close']).rolling(window=14).apply(
-        lambda x: 100 - 100 / (1 + (x.diff().clip(lower=0).sum() / (-x.diff().clip(upper=0).sum() + 1e-10)))
-    )
-    df['ema12'] = df['close'].ewm(span=12, adjust=False).mean()
-    df['ema26'] = df['close'].ewm(span=26, adjust=False).mean()
-    df['macd'] = df['ema12'] - df['ema26']
-    df['signal'] = df['macd'].ewm(span=9, adjust=False).mean()
-    df['sma50'] = df['close'].rolling(window=50).mean()
+    with TRACER.span("indicators"):
+        # One Bars per symbol per cycle: indicators are shared by every strategy
+        bars = Bars(symbol, [float(c) for c in rates['close']])
+        rsi = bars.get("rsi", RSI_PERIOD)
+        macd_line, signal_line = bars.get("macd", 12, 26, 9)
+        sma50 = bars.get("sma", 50)
 
-    rsi = df['rsi'].iloc[-1]
-    macd = df['macd'].iloc[-1]
-    macd_prev = df['macd'].iloc[-2]
-    signal = df['signal'].iloc[-1]
-    signal_prev = df['signal'].iloc[-2]
-    price = df['close'].iloc[-1]
-    sma50 = df['sma50'].iloc[-1]
+    macd = macd_line[-1]
+    signal = signal_line[-1]
+    price = bars.price
 
     print(f"📊 {symbol} RSI: {rsi:.2f}, MACD: {macd:.5f}, Signal: {signal:.5f}, SMA50: {sma50:.5f}")
 
@@ -108,84 +146,88 @@ for symbol in ["EURUSD", "GBPUSD"]:
         delta = (datetime.now() - last_trade_time[symbol]).total_seconds() / 60
         if delta < trade_cooldown_minutes:
             print(f"🕒 Skipping {symbol} - cooldown {delta:.1f} mins")
-            continue
-
-    rsi_threshold = symbol_rsi_threshold.get(symbol, 40)
+            SKIPPED_SIGNALS.inc(symbol=symbol, reason="cooldown")
+            EVENTS.publish("decision", symbol, action="skip", reason="cooldown", rsi=rsi)
+            return
 
-    action = None
-    if rsi < rsi_threshold and macd > signal and macd_prev < signal_prev and price > sma50:
-        action = mt5.ORDER_TYPE_BUY
-    elif rsi > 70 and macd < signal and macd_prev > signal_prev and price < sma50:
-        action = mt5.ORDER_TYPE_SELL
+    with TRACER.span("strategies"):
+        fired = evaluate(strategies, bars)
+    strategy, side = fired[0] if fired else (None, None)
+    EVENTS.publish("decision", symbol, action=side or "skip", reason="signal" if fired else "no_setup",
+                   strategy=strategy.name if strategy else None,
+                   fired=[s.name for s, _ in fired], rsi=rsi, macd=macd, signal=signal, sma50=sma50, price=price)
 
-    if action is not None:
-        tick = mt5.symbol_info_tick(symbol)
-        price = tick.ask if action == mt5.ORDER_TYPE_BUY else tick.bid
-        sl = price - 0.001 if action == mt5.ORDER_TYPE_BUY else price + 0.001
-        tp = price + 0.002 if action == mt5.ORDER_TYPE_BUY else price - 0.002
-
-        result = mt5.order_send({
-            "action": mt5.TRADE_ACTION_DEAL,
-            "symbol": symbol,
-            "volume": 0.1,
-            "type": action,
-            "price": price,
-            "sl": sl,
-            "tp": tp,
-            "deviation": 10,
-            "magic": 123456,
-            "comment": "RSI+MACD+SMA entry",
-            "type_time": mt5.ORDER_TIME_GTC,
-            "type_filling": mt5.ORDER_FILLING_IOC,
-        })
-
-        if result.retcode == mt5.TRADE_RETCODE_DONE:
-            print(f"✅ Trade executed on {symbol} @ {price}")
-            last_trade_time[symbol] = datetime.now()
-            close_price = tp  # Simulated
-            pnl = tp - price if action == mt5.ORDER_TYPE_BUY else price - tp
-            exit_reason = "TP"
-            trailing_hit = False
+    record = None
+    if strategy is not None:
+        signal_time = time.perf_counter()
+        with TRACER.span("symbol_info_tick"), MT5_CALL_SECONDS.time(call="symbol_info_tick"):
+            tick = mt5.symbol_info_tick(symbol)
+        price = tick.ask if side == "buy" else tick.bid
+        request, reason = SYMBOL_META.market_order(symbol, side, VOLUME, price, SL_PIPS, TP_PIPS,
+                                                   magic=123456, comment=f"{strategy.label} entry")
+        if request is None:
+            # Would be rejected by the broker anyway; skip the round trip
+            print(f"🚫 {symbol} order failed local checks: {reason}")
+            SKIPPED_SIGNALS.inc(symbol=symbol, reason=reason)
+            EVENTS.publish("decision", symbol, action="skip", reason=reason, price=price)
+        else:
+            sl, tp = request["sl"], request["tp"]
+            with TRACER.span("order_send"), MT5_CALL_SECONDS.time(call="order_send"):
+                result = mt5.order_send(request)
 
-            exit_emoji = "🎯" if exit_reason == "TP" else "🛑" if exit_reason == "SL" else "🏃"
+            ORDER_RETCODES.inc(symbol=symbol, retcode=result.retcode)
+            if result.retcode == mt5.TRADE_RETCODE_DONE:
+                SIGNAL_TO_FILL_SECONDS.observe(time.perf_counter() - signal_time, symbol=symbol)
+                print(f"✅ Trade executed on {symbol} @ {price}")
+                last_trade_time[symbol] = datetime.now()
+                close_price = tp  # Simulated
+                pnl = SYMBOL_META.get(symbol).pnl(price, tp, request["volume"], side)
+                exit_reason = "TP"
+                trailing_hit = False
 
-            trade = {
-                "timestamp": datetime.now(),
-                "symbol": symbol,
-                "type": "buy" if action == mt5.ORDER_TYPE_BUY else "sell",
-                "volume": 0.1,
-                "price": price,
-                "sl": sl,
-                "tp": tp,
-                "comment": "RSI+MACD+SMA",
-                "strategy": "rsi_macd_sma",
-                "close_price": close_price,
-                "pnl": pnl,
-                "exit_reason": exit_reason,
-                "trailing_hit": trailing_hit,
-                "exit_emoji": exit_emoji
-            }
-            log_trade(trade)
-            git_push_log()
-            send_alert("Trade Executed", f"{symbol} {'BUY' if action == 0 else 'SELL'} @ {price:.5f} | PnL: {pnl:.2f} | Exit: {exit_reason} | Trailing SL: {'✅' if trailing_hit else '❌'}")
-        else:
-            print(f"❌ Trade failed for {symbol}. Error: {result.retcode}")
+                record = TradeRecord(
+                    timestamp=datetime.now(),
+                    symbol=symbol,
+                    type=side,
+                    volume=request["volume"],
+                    price=price,
+                    sl=sl,
+                    tp=tp,
+                    comment=strategy.label,
+                    strategy=strategy.name,
+                    close_price=close_price,
+                    pnl=pnl,
+                    exit_reason=exit_reason,
+                    trailing_hit=trailing_hit,
+                )
+                EVENTS.publish("position", symbol, status="open", side=side, volume=request["volume"],
+                               price=price, sl=sl, tp=tp)
+                EVENTS.publish("trade", **record)
+                EVENTS.publish("position", symbol, status="closed", side=side, price=close_price, pnl=pnl)
+                with TRACER.span("alert"):
+                    send_alert("Trade Executed", f"{symbol} {side.upper()} @ {price:.5f} | PnL: {pnl:.2f} | Exit: {exit_reason} | Trailing SL: {'✅' if trailing_hit else '❌'}")
+            else:
+                print(f"❌ Trade failed for {symbol}. Error: {result.retcode}")
+                EVENTS.publish("decision", symbol, action="skip", reason=f"retcode_{result.retcode}", price=price)
     else:
         print(f"⏸️ Skipping {symbol} (no trade setup)")
-        log_skipped(symbol, rsi)
+        SKIPPED_SIGNALS.inc(symbol=symbol, reason="no_setup")
+        with TRACER.span("csv_write"):
+            log_skipped(symbol, rsi)
 
     lowest_equity = min(lowest_equity, equity)
     drawdown = 1 - (lowest_equity / equity if equity != 0 else 1)
     if drawdown > max_drawdown_pct:
         send_alert("⚠️ Max Drawdown Alert", f"Drawdown exceeded: {drawdown*100:.2f}%")
+    return record
 
-mt5.shutdown()
-
-if name == "main":
-try:
-while True:
-print(f"\n🕒 {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Checking signals")
-trade()
-time.sleep(600)
-except KeyboardInterrupt:
-print("👋 Bot stopped by user")
+if __name__ == "__main__":
+    start_metrics_server(9101)
+    try:
+        while True:
+            print(f"\n🕒 {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Checking signals")
+            with CYCLE_SECONDS.time(), TRACER.cycle():
+                trade()
+            time.sleep(600)
+    except KeyboardInterrupt:
+        print("👋 Bot stopped by user")
@@ -0,0 +1,141 @@
+import os, sys, glob, re
+import duckdb
+from backtest_store import ingest
+
+# 🦆 In-process DuckDB over trade_logs/ and backtests/. Views read the files
+# lazily, so queries stream from disk, run on all cores and spill to
+# TEMP_DIR when an aggregation does not fit in MEMORY_LIMIT. Once the views
+# exist the connection is locked to those folders, so ad-hoc SQL can't use
+# read_text/read_csv on secrets, .env or anything else on the host.
+TRADE_LOG_GLOB = "trade_logs/*.csv"
+BACKTEST_DIR = "backtests"
+MEMORY_LIMIT = os.getenv("DUCKDB_MEMORY_LIMIT", "2GB")
+THREADS = int(os.getenv("DUCKDB_THREADS", os.cpu_count() or 1))
+TEMP_DIR = os.getenv("DUCKDB_TEMP_DIR", ".duckdb_tmp")
+
+# Charts from the dashboards, expressed as queries over a source view `{src}`
+CHART_QUERIES = {
+    "row_count": "SELECT count(*) AS n FROM {src}",
+    # The summary cards of metrics.summary_metrics, aggregated in DuckDB so one
+    # row comes back instead of the table (its expectancy works out to the mean)
+    "summary": """
+        WITH t AS (
+            SELECT pnl, row_number() OVER (ORDER BY timestamp) AS i FROM {src} WHERE pnl IS NOT NULL),
+        e AS (SELECT pnl, i, sum(pnl) OVER (ORDER BY i) AS equity FROM t),
+        d AS (SELECT pnl, equity - greatest(max(equity) OVER (ORDER BY i), 0) AS drawdown FROM e)
+        SELECT count(*) AS Trades,
+               coalesce(sum(pnl), 0) AS Total_PnL,
+               coalesce(avg((pnl > 0)::INT) * 100, 0) AS Win_Rate,
+               coalesce(avg(pnl), 0) AS Expectancy,
+               CASE WHEN count(*) = 0 THEN 0
+                    ELSE coalesce(avg(pnl) / nullif(sqrt(avg(least(pnl, 0) ** 2)), 0), 'NaN') END AS Sortino,
+               coalesce(min(drawdown), 0) AS Max_Drawdown
+        FROM d""",
+    "monthly_win_rate": """
+        SELECT date_trunc('month', timestamp) AS month, avg((pnl > 0)::INT) * 100 AS win_rate
+        FROM {src} WHERE pnl IS NOT NULL GROUP BY ALL ORDER BY month""",
+    "daily_pnl": """
+        SELECT CAST(timestamp AS DATE) AS day, sum(pnl) AS pnl
+        FROM {src} GROUP BY ALL ORDER BY day""",
+    "weekday_pnl": """
+        SELECT dayname(timestamp) AS weekday, avg(pnl) AS pnl
+        FROM {src} GROUP BY weekday, isodow(timestamp) ORDER BY isodow(timestamp)""",
+    "hour_pnl": """
+        SELECT hour(timestamp) AS hour, avg(pnl) AS pnl
+        FROM {src} GROUP BY ALL ORDER BY hour""",
+    "holding_pnl": """
+        WITH t AS (SELECT pnl, epoch(close_time - timestamp) / 60 AS minutes FROM {src})
+        SELECT CASE
+                 WHEN minutes <= 5 THEN '<5m' WHEN minutes <= 15 THEN '5-15m'
+                 WHEN minutes <= 30 THEN '15-30m' WHEN minutes <= 60 THEN '30-60m'
+                 WHEN minutes <= 180 THEN '1-3h' WHEN minutes <= 720 THEN '3-12h'
+                 ELSE '12h+' END AS holding_bucket,
+               avg(pnl) AS pnl, min(minutes) AS bucket_start
+        FROM t WHERE minutes > 0 GROUP BY ALL ORDER BY bucket_start""",
+    "symbol_equity": """
+        SELECT symbol, timestamp,
+               sum(pnl) OVER (PARTITION BY symbol ORDER BY timestamp ROWS UNBOUNDED PRECEDING) AS equity
+        FROM {src} ORDER BY symbol, timestamp""",
+    "trade_log": "SELECT * FROM {src} ORDER BY timestamp DESC LIMIT {limit}",
+}
+
+READ_ONLY_STATEMENTS = {duckdb.StatementType.SELECT, duckdb.StatementType.EXPLAIN}
+
+
+def _view_name(path):
+    return "bt_" + re.sub(r"\W", "_", os.path.splitext(os.path.basename(path))[0])
+
+
+def connect():
+    con = duckdb.connect(":memory:", config={
+        "threads": THREADS,
+        "memory_limit": MEMORY_LIMIT,
+        "temp_directory": TEMP_DIR,
+        "preserve_insertion_order": False,
+    })
+    return con
+
+
+def sources_version():
+    # Changes when a trade log or backtest CSV is added, removed or rewritten,
+    # i.e. whenever register_sources would build different views
+    files = sorted(glob.glob(TRADE_LOG_GLOB)) + sorted(glob.glob(os.path.join(BACKTEST_DIR, "*.csv")))
+    return tuple((f, os.stat(f).st_mtime_ns) for f in files)
+
+
+def register_sources(con):
+    # `live` = every trade log, `bt_<name>` = one backtest, `backtests` = all of them.
+    # Returns {dashboard label: view name}
+    sources = {}
+    if glob.glob(TRADE_LOG_GLOB):
+        con.execute(f"""
+            CREATE OR REPLACE VIEW live AS
+            SELECT * REPLACE (TRY_CAST(timestamp AS TIMESTAMP) AS timestamp, TRY_CAST(pnl AS DOUBLE) AS pnl)
+            FROM read_csv('{TRADE_LOG_GLOB}', union_by_name = true)""")
+        sources["Live"] = "live"
+
+    parquet_files = ingest(BACKTEST_DIR)
+    for path in parquet_files:
+        con.execute(f"CREATE OR REPLACE VIEW {_view_name(path)} AS SELECT * FROM read_parquet('{path}')")
+        sources[os.path.splitext(path)[0] + ".csv"] = _view_name(path)
+    if parquet_files:
+        con.execute(f"""
+            CREATE OR REPLACE VIEW backtests AS
+            SELECT * EXCLUDE (filename), regexp_extract(filename, '([^/\\\\]+)\\.parquet$', 1) AS source
+            FROM read_parquet('{BACKTEST_DIR}/*.parquet', union_by_name = true, filename = true)""")
+    lock_down(con)
+    return sources
+
+
+def lock_down(con):
+    # Only the data folders stay readable, and SET can't undo it afterwards
+    allowed = [os.path.abspath(d) + os.sep for d in (os.path.dirname(TRADE_LOG_GLOB), BACKTEST_DIR, TEMP_DIR)]
+    con.execute(f"SET allowed_directories = {allowed!r}")
+    con.execute("SET enable_external_access = false")
+    con.execute("SET autoinstall_known_extensions = false")
+    con.execute("SET autoload_known_extensions = false")
+    con.execute("SET lock_configuration = true")
+
+
+def columns(con, view):
+    return [row[0] for row in con.execute(f"DESCRIBE {view}").fetchall()]
+
+
+def chart(con, name, src, **params):
+    return con.execute(CHART_QUERIES[name].format(src=src, **params)).df()
+
+
+def run_sql(con, sql):
+    # Ad-hoc box: exactly one read-only statement
+    statements = con.extract_statements(sql)
+    if len(statements) != 1:
+        raise ValueError("Enter exactly one SQL statement.")
+    if statements[0].type not in READ_ONLY_STATEMENTS:
+        raise ValueError("Only SELECT queries are allowed.")
+    return con.execute(sql).df()
+
+
+if __name__ == "__main__":
+    con = connect()
+    register_sources(con)
+    print(run_sql(con, sys.argv[1] if len(sys.argv) > 1 else "SELECT source, count(*) AS trades, sum(pnl) AS pnl FROM backtests GROUP BY ALL"))
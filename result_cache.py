@@ -0,0 +1,115 @@
+import hashlib, inspect, json, os, time, uuid
+
+# 🗃️ Content-addressed cache for backtest results, shared by every process on
+# the machine (dashboards, sweeps, CLI runs). The key is a hash of everything
+# that decides the result: strategy code, parameters, symbol and a fingerprint
+# of the bar data. Each entry is the trade frame (Parquet) plus its metrics
+# (JSON). Hits refresh the entry's mtime; evict(), called once after a batch
+# of puts, deletes the least recently used entries while the folder is over
+# RESULT_CACHE_MAX_BYTES.
+
+CACHE_DIR = os.getenv("RESULT_CACHE_DIR", ".result_cache")
+MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", 512 * 2**20))
+
+_fingerprints = {}
+
+
+def make_key(**parts):
+    blob = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+def code_version(*objects):
+    # Hash of the source of the functions/classes/modules a result depends on
+    h = hashlib.sha256()
+    for obj in objects:
+        h.update(inspect.getsource(obj).encode())
+    return h.hexdigest()[:16]
+
+
+def file_fingerprint(path):
+    # Content hash, memoized per (size, mtime) so unchanged files aren't re-read
+    st = os.stat(path)
+    memo = (path, st.st_size, st.st_mtime_ns)
+    if memo not in _fingerprints:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        _fingerprints[memo] = h.hexdigest()[:16]
+    return _fingerprints[memo]
+
+
+class ResultCache:
+    def __init__(self, folder=CACHE_DIR, max_bytes=MAX_BYTES):
+        self.folder = folder
+        self.max_bytes = max_bytes
+
+    def _paths(self, key):
+        base = os.path.join(self.folder, key[:2], key)
+        return base + ".parquet", base + ".json"
+
+    def get(self, key):
+        # (trades DataFrame, metrics dict) or None
+        import pandas as pd
+        trades_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                entry = json.load(f)
+            trades = pd.read_parquet(trades_path)
+        except (FileNotFoundError, ValueError, OSError):
+            return None
+        now = time.time()
+        for p in (trades_path, meta_path):
+            try:
+                os.utime(p, (now, now))
+            except OSError:
+                pass
+        return trades, entry["metrics"]
+
+    def put(self, key, trades, metrics, **info):
+        trades_path, meta_path = self._paths(key)
+        os.makedirs(os.path.dirname(trades_path), exist_ok=True)
+        tmp = f".{uuid.uuid4().hex}.tmp"
+        # Metrics JSON goes last: an entry only counts once both files are in place
+        trades.to_parquet(trades_path + tmp, index=False)
+        os.replace(trades_path + tmp, trades_path)
+        with open(meta_path + tmp, "w", encoding="utf-8") as f:
+            json.dump({"metrics": metrics, "created": time.time(), **info}, f, default=str)
+        os.replace(meta_path + tmp, meta_path)
+
+    def entries(self):
+        # [(mtime, size, [paths])] per key
+        grouped = {}
+        for root, _, names in os.walk(self.folder):
+            for name in names:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entry = grouped.setdefault(os.path.splitext(name)[0], [0, 0, []])
+                entry[0] = max(entry[0], st.st_mtime)
+                entry[1] += st.st_size
+                entry[2].append(path)
+        return sorted(grouped.values())
+
+    def evict(self):
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, paths in entries:  # oldest first
+            if total <= self.max_bytes:
+                break
+            for p in paths:
+                try:
+                    os.remove(p)
+                except FileNotFoundError:
+                    pass
+            total -= size
+
+    def clear(self):
+        for _, _, paths in self.entries():
+            for p in paths:
+                os.remove(p)
@@ -0,0 +1,101 @@
+import glob, hashlib, os, tempfile
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+from lazy_tabs import file_version
+from trade_record import read_trades
+
+# 🧠 Trade datasets shared by every dashboard session on the host. Each trade
+# file is normalized once per file version into an uncompressed Arrow IPC file
+# under SHARED_DATA_DIR (/dev/shm when there is one), and every server process
+# memory-maps it, so all processes read the same page-cache pages. Within a
+# process the mapped table is a cache_resource, and sessions get DataFrame
+# views over its buffers instead of their own copies: N viewers cost about
+# what one does. A rewritten source file gets a new Arrow file on next access,
+# and the Arrow files of deleted sources are removed on the next publish. The
+# folder is private to the dashboard's user (0700, files 0600).
+#
+#   df = load_trades("backtests/rsi.csv")  # zero-copy view; add columns freely
+
+SHARED_DIR = os.getenv("SHARED_DATA_DIR") or os.path.join(
+    "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(), "mt5-dashboard")
+MAX_TABLES = int(os.getenv("SHARED_DATA_MAX_TABLES", 64))
+
+
+def _arrow_path(path):
+    source = hashlib.sha256(os.path.abspath(path).encode()).hexdigest()[:16]
+    st_ = os.stat(path)
+    version = hashlib.sha256(f"{st_.st_size}:{st_.st_mtime_ns}".encode()).hexdigest()[:16]
+    return os.path.join(SHARED_DIR, f"{source}-{version}.arrow")
+
+
+def _private_dir():
+    os.makedirs(SHARED_DIR, mode=0o700, exist_ok=True)
+    if hasattr(os, "getuid") and os.stat(SHARED_DIR).st_uid != os.getuid():
+        raise PermissionError(f"{SHARED_DIR} belongs to another user")
+    os.chmod(SHARED_DIR, 0o700)  # also tightens a folder made by an older version
+
+
+def _source(arrow_file):
+    # Source path recorded when the file was published (None for unreadable/older files)
+    try:
+        with pa.memory_map(arrow_file) as source:
+            metadata = pa.ipc.open_file(source).schema.metadata or {}
+        return metadata.get(b"source", b"").decode() or None
+    except (pa.ArrowInvalid, OSError):
+        return None
+
+
+def _remove(paths):
+    # Mappings still open elsewhere stay valid on POSIX
+    for p in paths:
+        try:
+            os.remove(p)
+        except OSError:
+            pass
+
+
+def publish(path):
+    # Arrow copy of `path` for its current version; whichever process gets here first writes it
+    _private_dir()
+    out = _arrow_path(path)
+    if os.path.exists(out):
+        return out
+    table = pa.Table.from_pandas(read_trades(path), preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), b"source": os.path.abspath(path).encode()})
+    tmp = f"{out}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.chmod(tmp, 0o600)
+    os.replace(tmp, out)
+    # Older versions of the same file, and files whose source has been deleted
+    _remove(old for old in glob.glob(out.rsplit("-", 1)[0] + "-*.arrow") if old != out)
+    _remove(f for f in glob.glob(os.path.join(SHARED_DIR, "*.arrow"))
+            if f != out and not os.path.exists(_source(f) or ""))
+    return out
+
+
+def open_table(path):
+    # Read-only table whose buffers point into the memory map, nothing is copied
+    return pa.ipc.open_file(pa.memory_map(publish(path))).read_all()
+
+
+def _dtype(arrow_type):
+    # Numbers, flags and text stay Arrow-backed (zero-copy); timestamps become
+    # datetime64 so .dt works as usual (split_blocks avoids copying them when
+    # there are no nulls)
+    return None if pa.types.is_timestamp(arrow_type) else pd.ArrowDtype(arrow_type)
+
+
+def view(table):
+    return table.to_pandas(types_mapper=_dtype, split_blocks=True)
+
+
+@st.cache_resource(show_spinner=False, max_entries=MAX_TABLES)
+def _shared_table(path, version=None):
+    return open_table(path)
+
+
+def load_trades(path):
+    # Session-private DataFrame over the process-wide table for the file's current version
+    return view(_shared_table(path, file_version(path)))
@@ -0,0 +1,153 @@
+import os, random, threading, time
+from types import SimpleNamespace
+import numpy as np
+
+# 🧪 Simulated MetaTrader5 backend with the parts of the API the bots use.
+# Prices are a seeded random walk per symbol; each copy_rates_from_pos call
+# closes one new bar, so successive cycles see the market move. Used by
+# `python supervisor.py --simulate` to run the whole pipeline off Windows.
+#
+#   SIM_SEED         random seed (default 42)
+#   SIM_CRASH_RATE   chance that a rates request raises, to exercise restarts
+#   SIM_REJECT_RATE  chance that order_send returns a requote
+
+TIMEFRAME_M1, TIMEFRAME_M5, TIMEFRAME_M15, TIMEFRAME_H1 = 1, 5, 15, 16385
+ORDER_TYPE_BUY, ORDER_TYPE_SELL = 0, 1
+TRADE_ACTION_DEAL = 1
+ORDER_TIME_GTC = 0
+ORDER_FILLING_FOK, ORDER_FILLING_IOC, ORDER_FILLING_RETURN = 0, 1, 2
+SYMBOL_FILLING_FOK, SYMBOL_FILLING_IOC = 1, 2
+TRADE_RETCODE_REQUOTE = 10004
+TRADE_RETCODE_DONE = 10009
+TRADE_RETCODE_INVALID_VOLUME = 10014
+TRADE_RETCODE_INVALID_STOPS = 10016
+
+# name: (start price, digits, contract size, volume min, volume step, stops level, volatility per bar)
+SYMBOLS = {
+    "EURUSD": (1.0850, 5, 100_000, 0.01, 0.01, 0, 0.0004),
+    "GBPUSD": (1.2700, 5, 100_000, 0.01, 0.01, 0, 0.0005),
+    "USDJPY": (151.50, 3, 100_000, 0.01, 0.01, 0, 0.06),
+    "XAUUSD": (2350.0, 2, 100, 0.01, 0.01, 10, 1.5),
+    "BTCUSD": (65000.0, 2, 1, 0.01, 0.01, 100, 120.0),
+}
+SPREAD_POINTS = 10
+BALANCE = 10_000.0  # positions aren't tracked, so equity stays at balance
+CURRENCY = "USD"
+
+SEED = int(os.getenv("SIM_SEED", 42))
+_crash_rate = float(os.getenv("SIM_CRASH_RATE", 0))
+_reject_rate = float(os.getenv("SIM_REJECT_RATE", 0))
+_closes = {}
+_walks = {}  # one seeded RNG per symbol, so prices don't depend on sharding
+_faults = random.Random()  # crashes/requotes differ per process, or a restart would replay them
+_lock = threading.Lock()
+_initialized = False
+
+
+def initialize(path=None, **kwargs):
+    global _initialized
+    _initialized = True
+    return True
+
+
+def shutdown():
+    global _initialized
+    _initialized = False
+
+
+def last_error():
+    return (1, "Success") if _initialized else (-10004, "No IPC connection")
+
+
+def _spec(symbol):
+    return SYMBOLS.get(symbol)
+
+
+def _history(symbol, count, advance=True):
+    # Extend the walk by one bar per call (plus enough history to fill the request)
+    start, digits, *_, vol = _spec(symbol)
+    closes = _closes.setdefault(symbol, [start])
+    rng = _walks.setdefault(symbol, random.Random(f"{SEED}-{symbol}"))
+    for _ in range(max(int(advance), count - len(closes))):
+        closes.append(round(max(closes[-1] + rng.gauss(0, vol), vol), digits))
+    return closes
+
+
+def _quote_value(quote):
+    # Account-currency value of one unit of the quote currency, at the current price
+    if quote == CURRENCY:
+        return 1.0
+    if CURRENCY + quote in SYMBOLS:
+        return 1 / _history(CURRENCY + quote, 1, advance=False)[-1]
+    if quote + CURRENCY in SYMBOLS:
+        return _history(quote + CURRENCY, 1, advance=False)[-1]
+    raise ValueError(f"no {quote}/{CURRENCY} rate in SYMBOLS")
+
+
+def copy_rates_from_pos(symbol, timeframe, start_pos, count):
+    if not _initialized or _spec(symbol) is None:
+        return None
+    if _faults.random() < _crash_rate:
+        raise RuntimeError(f"simulated terminal disconnect on {symbol}")
+    with _lock:
+        closes = _history(symbol, count + start_pos)
+        window = closes[len(closes) - start_pos - count:len(closes) - start_pos]
+    now = int(time.time()) // 60 * 60
+    rates = np.zeros(len(window), dtype=[("time", "i8"), ("open", "f8"), ("high", "f8"),
+                                         ("low", "f8"), ("close", "f8"), ("tick_volume", "i8")])
+    rates["time"] = now - timeframe * 60 * np.arange(len(window))[::-1]
+    rates["close"] = window
+    rates["open"] = np.r_[window[:1], window[:-1]]
+    rates["high"] = np.maximum(rates["open"], rates["close"])
+    rates["low"] = np.minimum(rates["open"], rates["close"])
+    rates["tick_volume"] = 100
+    return rates
+
+
+def symbol_info_tick(symbol):
+    spec = _spec(symbol)
+    if not _initialized or spec is None:
+        return None
+    with _lock:
+        # Ticks wander around the last close without closing a new bar
+        last = round(_history(symbol, 1, advance=False)[-1] + _faults.gauss(0, spec[-1] / 4), spec[1])
+    point = 10 ** -spec[1]
+    return SimpleNamespace(time=int(time.time()), bid=last, ask=round(last + SPREAD_POINTS * point, spec[1]),
+                           last=last, volume=0)
+
+
+def symbol_info(symbol):
+    spec = _spec(symbol)
+    if not _initialized or spec is None:
+        return None
+    start, digits, contract, vol_min, vol_step, stops, _ = spec
+    point = 10 ** -digits
+    with _lock:
+        # A tick moves contract * point in the quote currency (JPY for USDJPY)
+        tick_value = contract * point * _quote_value(symbol[3:])
+    return SimpleNamespace(
+        name=symbol, point=point, digits=digits, trade_contract_size=contract,
+        trade_tick_size=point, trade_tick_value=tick_value,
+        volume_min=vol_min, volume_max=100.0, volume_step=vol_step,
+        trade_stops_level=stops, filling_mode=SYMBOL_FILLING_FOK | SYMBOL_FILLING_IOC,
+        spread=SPREAD_POINTS, visible=True,
+    )
+
+
+def account_info():
+    if not _initialized:
+        return None
+    return SimpleNamespace(login=0, currency=CURRENCY, balance=BALANCE, equity=BALANCE, margin=0.0,
+                           margin_free=BALANCE, leverage=100)
+
+
+def order_send(request):
+    symbol = request.get("symbol")
+    tick = symbol_info_tick(symbol)
+    if tick is None:
+        return None
+    if _faults.random() < _reject_rate:
+        return SimpleNamespace(retcode=TRADE_RETCODE_REQUOTE, comment="Requote", request=request)
+    price = tick.ask if request.get("type") == ORDER_TYPE_BUY else tick.bid
+    return SimpleNamespace(retcode=TRADE_RETCODE_DONE, comment="Request executed", price=price,
+                           volume=request.get("volume"), order=_faults.randrange(10**8), request=request)
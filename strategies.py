@@ -0,0 +1,169 @@
+import abc, math
+from indicators import rsi, macd, sma
+
+# 🧩 Strategy registry. A strategy declares the indicators it reads; all the
+# strategies running on a symbol share one Bars object per bar, which computes
+# each (indicator, params) once and hands the same result to every strategy
+# that asked for it. Twenty RSI/MACD variants cost one RSI and one MACD.
+#
+#   strategies = load(["rsi_macd_sma", "rsi"], {"rsi": {"buy_below": 25}})
+#   for strategy, side in evaluate(strategies, Bars("EURUSD", closes)): ...
+
+RSI_PERIOD = 14  # price changes, i.e. RSI_PERIOD + 1 closes
+
+INDICATORS = {
+    "rsi": rsi,    # (period) -> last value
+    "macd": macd,  # (fast, slow, signal) -> (line, signal) series
+    "sma": sma,    # (period) -> last value
+}
+
+STRATEGIES = {}
+
+
+def register(cls):
+    STRATEGIES[cls.name] = cls
+    return cls
+
+
+class Bars:
+    # One symbol's closes at one bar, with indicators memoized for that bar
+    def __init__(self, symbol, closes):
+        self.symbol = symbol
+        self.closes = closes
+        self.price = closes[-1] if closes else math.nan
+        self._memo = {}
+
+    def get(self, name, *params):
+        key = (name, params)
+        if key not in self._memo:
+            self._memo[key] = INDICATORS[name](self.closes, *params)
+        return self._memo[key]
+
+
+class Strategy(abc.ABC):
+    name = ""
+    label = ""  # what goes in the trade log's comment column
+    # [(indicator, *params)] the strategy reads through bars.get
+    needs = ()
+    # Tunable settings, each a class attribute holding its default
+    PARAMS = ()
+
+    def __init__(self, **params):
+        unknown = sorted(set(params) - set(self.PARAMS))
+        if unknown:
+            raise TypeError(f"{self.name} has no parameter {unknown[0]!r} (has {', '.join(self.PARAMS) or 'none'})")
+        for k, v in params.items():
+            setattr(self, k, v)
+
+    @property
+    def params(self):
+        return {k: getattr(self, k) for k in self.PARAMS}
+
+    def bars_needed(self):
+        # Closes to fetch so every declared indicator has a full window
+        n = 1
+        for name, *params in self.needs:
+            if name == "macd":
+                fast, slow, signal = params
+                n = max(n, 3 * (slow + signal))  # EMAs need a few spans to settle
+            else:
+                n = max(n, params[0] + 1)
+        return n
+
+    @abc.abstractmethod
+    def signal(self, bars):
+        # "buy", "sell" or None
+        ...
+
+
+@register
+class RsiMacdSma(Strategy):
+    # mt5_bot: oversold RSI + MACD crossing up + price above trend (and the mirror for sells)
+    name = "rsi_macd_sma"
+    label = "RSI+MACD+SMA"
+    needs = (("rsi", RSI_PERIOD), ("macd", 12, 26, 9), ("sma", 50))
+    PARAMS = ("buy_below", "sell_above")
+    buy_below = 40
+    sell_above = 70
+
+    def signal(self, bars):
+        value = bars.get("rsi", RSI_PERIOD)
+        line, sig = bars.get("macd", 12, 26, 9)
+        trend = bars.get("sma", 50)
+        if len(line) < 2 or math.isnan(value) or math.isnan(trend):
+            return None
+        crossed_up = line[-1] > sig[-1] and line[-2] < sig[-2]
+        crossed_down = line[-1] < sig[-1] and line[-2] > sig[-2]
+        if value < self.buy_below and crossed_up and bars.price > trend:
+            return "buy"
+        if value > self.sell_above and crossed_down and bars.price < trend:
+            return "sell"
+        return None
+
+
+@register
+class RsiOversold(Strategy):
+    # live_mt5_bot_with_trailing: buy when RSI drops under the threshold
+    name = "rsi"
+    needs = (("rsi", RSI_PERIOD),)
+    PARAMS = ("buy_below",)
+    buy_below = 30
+
+    @property
+    def label(self):
+        return f"RSI < {self.buy_below}"
+
+    def signal(self, bars):
+        value = bars.get("rsi", RSI_PERIOD)
+        return "buy" if value < self.buy_below else None
+
+
+@register
+class MacdCross(Strategy):
+    name = "macd"
+    label = "MACD cross"
+    needs = (("macd", 12, 26, 9),)
+
+    def signal(self, bars):
+        line, sig = bars.get("macd", 12, 26, 9)
+        if len(line) < 2:
+            return None
+        if line[-1] > sig[-1] and line[-2] <= sig[-2]:
+            return "buy"
+        if line[-1] < sig[-1] and line[-2] >= sig[-2]:
+            return "sell"
+        return None
+
+
+@register
+class SmaTrend(Strategy):
+    # Price crossing its 50-bar average
+    name = "sma"
+    label = "SMA50 cross"
+    needs = (("sma", 50),)
+
+    def signal(self, bars):
+        now = bars.get("sma", 50)
+        prev = sma(bars.closes[:-1], 50)  # previous bar's average, not shared
+        if math.isnan(now) or math.isnan(prev):
+            return None
+        if bars.closes[-2] <= prev and bars.price > now:
+            return "buy"
+        if bars.closes[-2] >= prev and bars.price < now:
+            return "sell"
+        return None
+
+
+def load(names, params=None):
+    # Strategy instances by name; params = {name: {param: value}}
+    params = params or {}
+    return [STRATEGIES[name](**params.get(name, {})) for name in names]
+
+
+def bars_needed(strategies):
+    return max(s.bars_needed() for s in strategies)
+
+
+def evaluate(strategies, bars):
+    # [(strategy, "buy"/"sell")] for the strategies that fired on this bar
+    return [(s, side) for s in strategies for side in [s.signal(bars)] if side]
@@ -0,0 +1,254 @@
+import argparse, importlib, math, os, queue, sys, time
+import multiprocessing as mp
+import bot_metrics
+from event_stream import EventPublisher
+
+# 🧭 Symbol-sharding supervisor. Splits a bot's SYMBOLS across worker processes,
+# each with its own MT5 terminal session, so a blocking alert, trailing wait or
+# order round trip only stalls the symbols in that shard. The supervisor
+#   - restarts workers that crash or stop heartbeating (with backoff),
+#   - tracks equity over every shard's fills and halts new entries everywhere
+#     once the global drawdown passes max_drawdown_pct,
+#   - writes all fills to the one trade journal and runs the git sync,
+#   - hands a restarted worker its symbols' last fill times, so per-symbol
+#     cooldowns (mt5_bot.last_trade_time) survive the restart,
+#   - serves the workers' metrics, summed, on the bot's usual /metrics port.
+#
+#   python supervisor.py --bot trailing --workers 3
+#   python supervisor.py --simulate --cycles 20 --interval 0    # no MT5 needed
+#
+# MT5_TERMINAL_PATHS gives one terminal64.exe per shard (os.pathsep separated);
+# shards without one attach to the default terminal.
+
+# name: (module, per-symbol trade function, git sync function, metrics port)
+BOTS = {
+    "mt5_bot": ("mt5_bot", "trade_symbol", "git_push_log", 9101),
+    "trailing": ("live_mt5_bot_with_trailing", "trade", "sync_to_github", 9102),
+}
+TERMINALS = [p for p in os.getenv("MT5_TERMINAL_PATHS", "").split(os.pathsep) if p]
+START_EQUITY = float(os.getenv("START_EQUITY", 10000))
+MAX_DRAWDOWN_PCT = float(os.getenv("MAX_DRAWDOWN_PCT", 0.1))
+RESTART_BACKOFF = (1, 60)  # first and longest wait before restarting a worker, seconds
+STABLE_SECONDS = 300  # a worker that ran this long restarts with the shortest backoff
+
+
+def load_bot(name, simulate=False):
+    if simulate:
+        # The bots `import MetaTrader5 as mt5`; hand them the simulator instead
+        import sim_mt5
+        sys.modules["MetaTrader5"] = sim_mt5
+    module, trade_fn, sync_fn, _ = BOTS[name]
+    bot = importlib.import_module(module)
+    if simulate:
+        bot._send_alert = lambda subject, body: print(f"📨 [sim] {subject}: {body}")
+    return bot, getattr(bot, trade_fn), getattr(bot, sync_fn)
+
+
+def shard_symbols(symbols, workers):
+    # Round-robin, so each shard gets a mix rather than one block of the list
+    return [symbols[i::workers] for i in range(min(workers, len(symbols)))]
+
+
+def run_worker(shard_id, symbols, bot_name, simulate, terminal, interval, cycles, events, halt, stop,
+               last_fills=None):
+    bot, trade, _ = load_bot(bot_name, simulate)
+    if last_fills and hasattr(bot, "last_trade_time"):
+        bot.last_trade_time.update(last_fills)
+    from tracing import Tracer
+    # One trace file per shard, so processes never rotate each other's file
+    bot.TRACER = Tracer(bot.TRACER.path.replace(".json", f"-w{shard_id}.json"))
+    mt5 = bot.mt5
+    if not (mt5.initialize(terminal) if terminal else mt5.initialize()):
+        raise SystemExit(f"❌ Shard {shard_id}: MT5 initialize failed {mt5.last_error()}")
+    print(f"🚀 Shard {shard_id} (pid {os.getpid()}): {', '.join(symbols)}")
+    try:
+        n = 0
+        while not stop.is_set() and (cycles is None or n < cycles):
+            events.put(("heartbeat", shard_id, time.time()))
+            with bot.CYCLE_SECONDS.time(), bot.TRACER.cycle():
+                for sym in symbols:
+                    if halt.is_set():
+                        bot.SKIPPED_SIGNALS.inc(symbol=sym, reason="risk_halt")
+                        continue
+                    with bot.TRACER.span("trade", symbol=sym):
+                        record = trade(sym)
+                    if record:
+                        events.put(("trade", shard_id, record))
+            events.put(("metrics", shard_id, (os.getpid(), bot_metrics.snapshot())))
+            n += 1
+            if cycles is None or n < cycles:
+                stop.wait(interval)
+    finally:
+        events.put(("metrics", shard_id, (os.getpid(), bot_metrics.snapshot())))
+        mt5.shutdown()
+
+
+class Supervisor:
+    def __init__(self, bot_name, workers=None, simulate=False, interval=600, cycles=None,
+                 stall_timeout=None, sync=True):
+        self.bot_name = bot_name
+        self.simulate = simulate
+        self.interval = interval
+        self.cycles = cycles
+        self.stall_timeout = stall_timeout or max(3 * interval, 300)
+        self.bot, _, self.sync = load_bot(bot_name, simulate)
+        self.do_sync = sync
+        symbols = list(self.bot.SYMBOLS)
+        self.shards = shard_symbols(symbols, workers or len(symbols))
+
+        ctx = mp.get_context("spawn")  # what Windows (and so MT5) uses anyway
+        self.ctx = ctx
+        self.events = ctx.Queue()
+        self.halt = ctx.Event()
+        self.stop = ctx.Event()
+        self.procs = {}
+        self.started = {}
+        self.last_beat = {}
+        self.backoff = {}
+        self.restart_at = {}
+        self.done = set()
+        self.restarts = 0
+        self.last_fill = {}  # symbol -> time of its last journaled fill
+        self.metrics = {}  # worker pid -> its latest metrics snapshot
+
+        self.max_drawdown_pct = getattr(self.bot, "max_drawdown_pct", MAX_DRAWDOWN_PCT)
+        self.equity = self.peak = START_EQUITY
+        self.trades = 0
+        self.events_out = EventPublisher("supervisor", self.bot.EVENTS.path)
+
+    # --- Workers ---
+    def start(self, i):
+        terminal = TERMINALS[i] if i < len(TERMINALS) else None
+        last_fills = {s: t for s, t in self.last_fill.items() if s in self.shards[i]}
+        p = self.ctx.Process(
+            target=run_worker, name=f"shard-{i}", daemon=True,
+            args=(i, self.shards[i], self.bot_name, self.simulate, terminal,
+                  self.interval, self.cycles, self.events, self.halt, self.stop, last_fills),
+        )
+        p.start()
+        self.procs[i] = p
+        self.started[i] = self.last_beat[i] = time.time()
+
+    def schedule_restart(self, i, why):
+        uptime = time.time() - self.started[i]
+        first, longest = RESTART_BACKOFF
+        wait = first if uptime >= STABLE_SECONDS else min(self.backoff.get(i, first / 2) * 2, longest)
+        self.backoff[i] = wait
+        self.restart_at[i] = time.time() + wait
+        self.procs[i] = None
+        self.restarts += 1
+        print(f"♻️ Shard {i} {why} after {uptime:.0f}s, restarting in {wait:.0f}s")
+
+    def check_workers(self):
+        now = time.time()
+        for i, p in list(self.procs.items()):
+            if i in self.done:
+                continue
+            if p is None:
+                if now >= self.restart_at[i]:
+                    self.start(i)
+            elif p.is_alive():
+                if now - self.last_beat[i] > self.stall_timeout:
+                    p.kill()
+                    p.join()
+                    self.schedule_restart(i, f"stalled (no heartbeat for {now - self.last_beat[i]:.0f}s)")
+            elif p.exitcode == 0:
+                self.done.add(i)
+            else:
+                self.schedule_restart(i, f"exited with code {p.exitcode}")
+
+    # --- Trade stream ---
+    def drain(self, timeout=1.0):
+        events = []
+        try:
+            events.append(self.events.get(timeout=timeout))
+            while len(events) < 1000:  # bounded, so worker checks still run under load
+                events.append(self.events.get_nowait())
+        except queue.Empty:
+            pass
+        trades = []
+        for kind, i, payload in events:
+            if kind == "heartbeat":
+                self.last_beat[i] = payload
+            elif kind == "metrics":
+                pid, snap = payload
+                self.metrics[pid] = snap
+            else:
+                trades.append(payload)
+        if not trades:
+            return
+        self.bot.log_trade(*trades)  # one batched write for everything that arrived
+        for trade in trades:
+            self.record(trade)
+        if self.do_sync:
+            # One push for everything that arrived, instead of one per fill
+            self.sync()
+
+    def record(self, trade):
+        self.trades += 1
+        self.last_fill[trade.symbol] = trade.timestamp
+        if trade.pnl is not None and not math.isnan(trade.pnl):  # missing pnl is NaN
+            self.equity += trade.pnl
+        self.peak = max(self.peak, self.equity)
+        drawdown = 1 - self.equity / self.peak
+        self.events_out.publish("equity", equity=self.equity, peak=self.peak, drawdown=drawdown)
+        if drawdown > self.max_drawdown_pct and not self.halt.is_set():
+            self.halt.set()
+            print(f"🛑 Global drawdown {drawdown * 100:.2f}% > {self.max_drawdown_pct * 100:.0f}%, halting new entries")
+            self.bot.send_alert("⚠️ Max Drawdown Alert",
+                                f"Drawdown across {len(self.shards)} shards: {drawdown * 100:.2f}%. New entries halted.")
+
+    def render_metrics(self):
+        # Every run of every shard adds to the counts, gauges only come from running workers
+        running = {p.pid for i, p in list(self.procs.items()) if p is not None and i not in self.done}
+        snaps = [snap if pid in running else bot_metrics.without_gauges(snap)
+                 for pid, snap in list(self.metrics.items())]
+        return bot_metrics.render_all(snaps)
+
+    def run(self):
+        print(f"🧭 {self.bot_name}: {len(self.shards)} shards {self.shards}")
+        server = bot_metrics.start_metrics_server(BOTS[self.bot_name][3], render=self.render_metrics)
+        for i in range(len(self.shards)):
+            self.start(i)
+        try:
+            while len(self.done) < len(self.shards):
+                self.drain()
+                self.check_workers()
+        except KeyboardInterrupt:
+            print("👋 Stopping workers")
+        finally:
+            self.stop.set()
+            for p in self.procs.values():
+                if p is not None:
+                    p.join(timeout=30)
+                    if p.is_alive():
+                        p.kill()
+            self.drain(timeout=0.1)
+            if server:
+                server.shutdown()
+                server.server_close()
+        print(f"📒 {self.trades} trades journaled, equity {self.equity:.2f}, "
+              f"{self.restarts} restarts{', entries halted' if self.halt.is_set() else ''}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a bot's symbols across supervised worker processes")
+    parser.add_argument("--bot", choices=list(BOTS), default="trailing")
+    parser.add_argument("--workers", type=int, help="number of shards (default: one per symbol)")
+    parser.add_argument("--interval", type=float, default=600, help="seconds between cycles")
+    parser.add_argument("--cycles", type=int, help="stop after this many cycles per shard")
+    parser.add_argument("--stall-timeout", type=float, help="restart a shard after this long without a heartbeat")
+    parser.add_argument("--simulate", action="store_true", help="use the simulated MT5 backend (sim_mt5.py)")
+    parser.add_argument("--workdir", default="sim_run", help="journal/log folder for --simulate")
+    args = parser.parse_args()
+
+    if args.simulate:
+        # Keep simulated fills out of the real trade_logs and skip git pushes
+        os.makedirs(args.workdir, exist_ok=True)
+        os.environ["GIT_REPO_PATH"] = os.path.abspath(args.workdir)
+        os.environ.setdefault("TRAIL_WAIT_SECONDS", "0")
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        os.chdir(args.workdir)
+
+    Supervisor(args.bot, args.workers, args.simulate, args.interval, args.cycles,
+               args.stall_timeout, sync=not args.simulate).run()
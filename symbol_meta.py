@@ -0,0 +1,160 @@
+import math, os, time
+
+# 🏷️ Per-symbol contract specs from mt5.symbol_info, cached and refreshed every
+# SYMBOL_META_REFRESH seconds (tick value moves with FX rates). Orders start from
+# a prebuilt per-symbol template and are checked locally against the specs, so
+# a bad volume, too-close stop or unsupported filling mode is caught before an
+# order_send round trip instead of coming back as a rejected retcode.
+#
+# A pip is 10 points on 5/3-digit quotes and one point otherwise, which is far
+# too small on metals and crypto (one point of BTCUSD is $0.01). Those get a
+# pip size from PIP_SIZES (PIP_SIZES=BTCUSD=1,XAUUSD=0.1 overrides it), and no
+# stop is ever placed closer than the broker's stops level plus the spread.
+
+REFRESH_SECONDS = int(os.getenv("SYMBOL_META_REFRESH", 3600))
+PIP_SIZES = {"XAUUSD": 0.1, "XAGUSD": 0.01, "BTCUSD": 1.0, "ETHUSD": 0.1}
+PIP_SIZES.update({k: float(v) for k, _, v in (item.partition("=") for item in
+                                               os.getenv("PIP_SIZES", "").split(",") if item)})
+
+
+class SymbolMeta:
+    def __init__(self, mt5, info):
+        self.mt5 = mt5
+        self.name = info.name
+        self.point = info.point
+        self.digits = info.digits
+        self.contract_size = info.trade_contract_size
+        self.tick_size = info.trade_tick_size or info.point
+        self.tick_value = info.trade_tick_value
+        self.volume_min = info.volume_min
+        self.volume_max = info.volume_max
+        self.volume_step = info.volume_step
+        self.stops_level = info.trade_stops_level
+        self.spread = getattr(info, "spread", 0) or 0  # points; not in saved backtest specs
+        self.filling_mode = info.filling_mode
+        self.loaded_at = time.monotonic()
+
+    @property
+    def pip(self):
+        # Per-symbol size if listed (broker suffixes like XAUUSD.m included);
+        # else 5/3-digit quotes carry a fractional pip and a pip is one point
+        size = PIP_SIZES.get(self.name) or PIP_SIZES.get(self.name[:6])
+        if size:
+            return size
+        return self.point * 10 if self.digits in (3, 5) else self.point
+
+    def pips(self, price_diff):
+        return price_diff / self.pip
+
+    def stop_distance(self, pips):
+        # Price distance for a stop `pips` away, widened to one point past the
+        # broker's minimum (stops level + spread) so the order isn't refused
+        floor = (self.stops_level + self.spread + 1) * self.point if self.stops_level else 0.0
+        return max(pips * self.pip, floor)
+
+    def pnl(self, entry, exit, volume, side="buy"):
+        # Account-currency P&L: ticks moved x value of one tick for one lot x lots
+        move = exit - entry if side == "buy" else entry - exit
+        return move / self.tick_size * self.tick_value * volume
+
+    def round_price(self, price):
+        return round(price, self.digits)
+
+    def normalize_volume(self, volume):
+        steps = math.floor(volume / self.volume_step + 1e-9)
+        return round(min(max(steps * self.volume_step, self.volume_min), self.volume_max), 8)
+
+    def allowed_fillings(self):
+        # filling_mode is a bitmask of SYMBOL_FILLING_*; RETURN is always accepted
+        mt5 = self.mt5
+        allowed = [mt5.ORDER_FILLING_RETURN]
+        if self.filling_mode & mt5.SYMBOL_FILLING_FOK:
+            allowed.insert(0, mt5.ORDER_FILLING_FOK)
+        if self.filling_mode & mt5.SYMBOL_FILLING_IOC:
+            allowed.insert(0, mt5.ORDER_FILLING_IOC)
+        return allowed
+
+    @property
+    def filling(self):
+        # IOC when offered (what the bots used to hard-code), else FOK, else RETURN
+        return self.allowed_fillings()[0]
+
+
+class SymbolCache:
+    def __init__(self, mt5, refresh_seconds=REFRESH_SECONDS):
+        self.mt5 = mt5
+        self.refresh_seconds = refresh_seconds
+        self._meta = {}
+        self._templates = {}
+
+    def get(self, symbol):
+        meta = self._meta.get(symbol)
+        if meta is None or time.monotonic() - meta.loaded_at > self.refresh_seconds:
+            info = self.mt5.symbol_info(symbol)
+            if info is None:
+                return meta  # keep serving the last good specs if the terminal hiccups
+            meta = self._meta[symbol] = SymbolMeta(self.mt5, info)
+            self._templates = {k: v for k, v in self._templates.items() if k[0] != symbol}
+        return meta
+
+    def template(self, symbol, magic, comment, deviation=10):
+        # The fields that never change between this bot's orders on a symbol
+        key = (symbol, magic, comment, deviation)
+        if key not in self._templates:
+            meta = self.get(symbol)
+            if meta is None:
+                return None
+            self._templates[key] = {
+                "action": self.mt5.TRADE_ACTION_DEAL,
+                "symbol": symbol,
+                "deviation": deviation,
+                "magic": magic,
+                "comment": comment,
+                "type_time": self.mt5.ORDER_TIME_GTC,
+                "type_filling": meta.filling,
+            }
+        return self._templates[key]
+
+    def market_order(self, symbol, side, volume, price, sl_pips, tp_pips, magic, comment, deviation=10):
+        # Returns (request, None) or (None, reason) without touching the terminal
+        template = self.template(symbol, magic, comment, deviation)
+        if template is None:
+            return None, "no_symbol_info"
+        meta = self.get(symbol)
+        sign = 1 if side == "buy" else -1
+        request = dict(
+            template,
+            type=self.mt5.ORDER_TYPE_BUY if side == "buy" else self.mt5.ORDER_TYPE_SELL,
+            volume=meta.normalize_volume(volume),
+            price=meta.round_price(price),
+            sl=meta.round_price(price - sign * meta.stop_distance(sl_pips)),
+            tp=meta.round_price(price + sign * meta.stop_distance(tp_pips)),
+        )
+        reason = self.check(request)
+        return (None, reason) if reason else (request, None)
+
+    def check(self, request):
+        # Local version of the broker's checks; None if the request looks valid
+        meta = self.get(request["symbol"])
+        if meta is None:
+            return "no_symbol_info"
+        volume = request["volume"]
+        if not meta.volume_min <= volume <= meta.volume_max:
+            return "invalid_volume"
+        if abs(volume / meta.volume_step - round(volume / meta.volume_step)) > 1e-6:
+            return "invalid_volume"
+        price = request["price"]
+        if price <= 0:
+            return "invalid_price"
+        buy = request["type"] == self.mt5.ORDER_TYPE_BUY
+        min_gap = meta.stops_level * meta.point
+        for level, below in (("sl", buy), ("tp", not buy)):
+            stop = request.get(level)
+            if not stop:
+                continue
+            gap = price - stop if below else stop - price
+            if gap <= 0 or gap < min_gap:
+                return "invalid_stops"
+        if request["type_filling"] not in meta.allowed_fillings():
+            return "invalid_fill"
+        return None
@@ -0,0 +1,5 @@
+import os, sys
+
+# 🧪 Tests import the repo's flat modules directly
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+import backtest_store
+from backtest_store import convert_csv, distinct_values, ingest, read_backtest, time_bounds
+
+
+@pytest.fixture
+def backtest_csv(tmp_path, monkeypatch):
+    # 3 symbols x 2 strategies x 200 trades; 100-row groups -> 12 groups, 4 per symbol
+    monkeypatch.setattr(backtest_store, "ROW_GROUP_SIZE", 100)
+    rng = np.random.default_rng(5)
+    frames = []
+    for symbol in ("EURUSD", "GBPUSD", "USDJPY"):
+        for strategy in ("rsi", "macd"):
+            frames.append(pd.DataFrame({
+                "timestamp": pd.date_range("2024-01-01", periods=200, freq="6h"),
+                "symbol": symbol, "type": rng.choice(["buy", "sell"], 200), "volume": 0.1,
+                "price": rng.uniform(1, 2, 200).round(5), "comment": "", "strategy": strategy,
+                "pnl": rng.normal(0, 10, 200).round(2),
+            }))
+    df = pd.concat(frames).sample(frac=1, random_state=0)  # unsorted on disk, sorted on ingest
+    path = tmp_path / "sweep.csv"
+    df.to_csv(path, index=False)
+    return str(path), df
+
+
+def read_spy(monkeypatch):
+    calls = []
+    original = pq.ParquetFile.read_row_groups
+
+    def read_row_groups(self, row_groups, *args, **kwargs):
+        calls.append(list(row_groups))
+        return original(self, row_groups, *args, **kwargs)
+
+    monkeypatch.setattr(pq.ParquetFile, "read_row_groups", read_row_groups)
+    return calls
+
+
+def test_filters_prune_row_groups(backtest_csv, monkeypatch):
+    csv_path, df = backtest_csv
+    path = convert_csv(csv_path)
+    assert pq.ParquetFile(path).metadata.num_row_groups == 12
+    calls = read_spy(monkeypatch)
+
+    start, end = pd.Timestamp("2024-01-10"), pd.Timestamp("2024-01-20 23:59:59")
+    got = read_backtest(path, symbols=["GBPUSD"], strategies=["rsi"], types=["buy"], start=start, end=end)
+    want = df[(df["symbol"] == "GBPUSD") & (df["strategy"] == "rsi") & (df["type"] == "buy")
+              & df["timestamp"].between(start, end)]
+    assert len(got) == len(want) > 0
+    assert sorted(got["pnl"]) == sorted(want["pnl"])
+    # GBPUSD/rsi is 200 rows = 2 groups, and the date range falls inside the first
+    assert len(calls[-1]) == 1
+
+    read_backtest(path, symbols=["EURUSD", "USDJPY"])
+    assert len(calls[-1]) == 8
+    read_backtest(path)
+    assert len(calls[-1]) == 12
+
+
+def test_options_and_bounds_come_from_metadata(backtest_csv):
+    csv_path, df = backtest_csv
+    path = convert_csv(csv_path)
+    assert distinct_values(path) == {"symbol": ["EURUSD", "GBPUSD", "USDJPY"],
+                                     "strategy": ["macd", "rsi"], "type": ["buy", "sell"]}
+    lo, hi = time_bounds(path)
+    assert (pd.Timestamp(lo), pd.Timestamp(hi)) == (df["timestamp"].min(), df["timestamp"].max())
+
+
+def test_bad_cells_become_null_and_bad_files_are_skipped(tmp_path, capsys):
+    header = "timestamp,symbol,type,volume,price,pnl\n"
+    (tmp_path / "a.csv").write_text(header + "2024-01-01 10:00:00,EURUSD,buy,0.1,1.1,n/a\n"
+                                             "2024-01-01 11:00:00,EURUSD,buy,0.1,1.1,2.5\n")
+    (tmp_path / "b.csv").write_text(header + "yesterday,EURUSD,buy,0.1,1.1,1.0\n")
+    paths = ingest(str(tmp_path))
+    assert paths == [str(tmp_path / "a.parquet")]
+    assert "Skipping" in capsys.readouterr().out
+    assert distinct_values(paths[0]) == {"symbol": ["EURUSD"], "type": ["buy"]}
+    got = read_backtest(paths[0])
+    assert got["pnl"].isna().tolist() == [True, False] and got["pnl"].iloc[1] == 2.5
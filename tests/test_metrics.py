@@ -0,0 +1,111 @@
+import math
+import numpy as np
+import pandas as pd
+import pytest
+from metrics import METRIC_COLUMNS, compute_metrics, summary_metrics
+
+
+def naive_metrics(pnls):
+    # Straight per-trade loop over one group's pnl, already in time order
+    pnls = [p for p in pnls if not math.isnan(p)]
+    n = len(pnls)
+    wins = [p for p in pnls if p > 0]
+    losses = [p for p in pnls if p < 0]
+    mean = sum(pnls) / n
+    std = math.sqrt(sum((p - mean) ** 2 for p in pnls) / (n - 1)) if n > 1 else math.nan
+    downside = math.sqrt(sum(min(p, 0) ** 2 for p in pnls) / n)
+    gross_profit, gross_loss = sum(wins), -sum(losses)
+    win_rate = len(wins) / n
+    avg_win = gross_profit / len(wins) if wins else math.nan
+    avg_loss = -gross_loss / (n - len(wins)) if n > len(wins) else math.nan
+
+    equity = peak = max_dd = 0.0
+    dd_run = dd_best = win_run = win_best = loss_run = loss_best = 0
+    for p in pnls:
+        equity += p
+        peak = max(peak, equity)
+        max_dd = min(max_dd, equity - peak)
+        dd_run = dd_run + 1 if equity < peak else 0
+        win_run = win_run + 1 if p > 0 else 0
+        loss_run = loss_run + 1 if p <= 0 else 0
+        dd_best, win_best, loss_best = max(dd_best, dd_run), max(win_best, win_run), max(loss_best, loss_run)
+
+    if gross_loss > 0:
+        profit_factor = gross_profit / gross_loss
+    else:
+        profit_factor = math.inf if gross_profit > 0 else math.nan
+    return {
+        "Trades": n, "Total_PnL": sum(pnls), "Avg_PnL": mean, "Win_Rate": win_rate * 100,
+        "Avg_Win": avg_win, "Avg_Loss": avg_loss, "Profit_Factor": profit_factor,
+        "Expectancy": win_rate * np.nan_to_num(avg_win) + (1 - win_rate) * np.nan_to_num(avg_loss),
+        "Sharpe": mean / std if std > 0 else math.nan,
+        "Sortino": mean / downside if downside > 0 else math.nan,
+        "Max_Drawdown": max_dd, "Max_DD_Duration": dd_best,
+        "Max_Win_Streak": win_best, "Max_Loss_Streak": loss_best,
+    }
+
+
+def naive_by(df, by):
+    rows = {}
+    for key, group in df.groupby(by, sort=True):
+        group = group.sort_values("timestamp", kind="stable")
+        rows[key] = naive_metrics(group["pnl"].tolist())
+    return pd.DataFrame.from_dict(rows, orient="index")[METRIC_COLUMNS]
+
+
+@pytest.fixture
+def trades():
+    rng = np.random.default_rng(7)
+    n = 400
+    df = pd.DataFrame({
+        # Shuffled timestamps with repeats, so ordering and tie-breaks both matter
+        "timestamp": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 200, n), unit="h"),
+        "symbol": rng.choice(["EURUSD", "GBPUSD", "USDJPY", "XAUUSD"], n),
+        "pnl": rng.normal(0.5, 10, n).round(2),
+    })
+    df.loc[rng.choice(n, 40, replace=False), "pnl"] = np.nan
+    df.loc[rng.choice(n, 20, replace=False), "pnl"] = 0.0
+    # Single-row groups: one trade, one win and one loss
+    extra = pd.DataFrame({
+        "timestamp": pd.to_datetime(["2024-01-03", "2024-01-02", "2024-01-05"]),
+        "symbol": ["BTCUSD", "NZDUSD", "AUDUSD"],
+        "pnl": [12.5, -3.0, np.nan],
+    })
+    extra = pd.concat([extra, pd.DataFrame({"timestamp": [pd.Timestamp("2024-01-04")],
+                                            "symbol": ["AUDUSD"], "pnl": [4.0]})])
+    return pd.concat([df, extra], ignore_index=True)
+
+
+def test_compute_metrics_matches_naive_per_group(trades):
+    got = compute_metrics(trades, by="symbol")
+    want = naive_by(trades, "symbol")
+    assert list(got.index) == list(want.index)
+    assert list(got.columns) == METRIC_COLUMNS
+    pd.testing.assert_frame_equal(got.astype(float), want.astype(float), check_names=False, rtol=1e-9)
+
+
+def test_single_row_groups(trades):
+    got = compute_metrics(trades, by="symbol")
+    for symbol in ("BTCUSD", "NZDUSD", "AUDUSD"):
+        assert got.loc[symbol, "Trades"] == 1
+        assert math.isnan(got.loc[symbol, "Sharpe"])
+    assert got.loc["BTCUSD", "Max_Win_Streak"] == 1 and got.loc["BTCUSD", "Max_Drawdown"] == 0
+    assert got.loc["NZDUSD", "Max_Loss_Streak"] == 1 and got.loc["NZDUSD", "Max_Drawdown"] == -3.0
+
+
+def test_summary_metrics_matches_naive(trades):
+    got = summary_metrics(trades)
+    want = naive_metrics(trades.sort_values("timestamp", kind="stable")["pnl"].tolist())
+    for name in METRIC_COLUMNS:
+        assert got[name] == pytest.approx(want[name], rel=1e-9, nan_ok=True), name
+
+
+def test_unsorted_input_is_ordered_by_time(trades):
+    in_order = trades.sort_values("timestamp", kind="stable")  # ties keep file order either way
+    pd.testing.assert_frame_equal(compute_metrics(trades, by="symbol"), compute_metrics(in_order, by="symbol"))
+
+
+def test_no_valid_pnl():
+    df = pd.DataFrame({"timestamp": pd.to_datetime(["2024-01-01"]), "symbol": ["EURUSD"], "pnl": [np.nan]})
+    assert compute_metrics(df, by="symbol").empty
+    assert (summary_metrics(df) == 0).all()
@@ -0,0 +1,74 @@
+import duckdb
+import numpy as np
+import pandas as pd
+import pytest
+from metrics import summary_metrics
+from query_engine import chart, connect, register_sources, run_sql, sources_version
+
+TRADES = "timestamp,symbol,type,volume,price,pnl\n2024-01-02 10:00:00,EURUSD,buy,0.1,1.085,12.5\n"
+
+
+@pytest.fixture
+def con(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for folder in ("trade_logs", "backtests", ".streamlit"):
+        (tmp_path / folder).mkdir()
+    (tmp_path / "trade_logs" / "trade_log.csv").write_text(TRADES)
+    (tmp_path / "backtests" / "rsi.csv").write_text(TRADES)
+    (tmp_path / ".streamlit" / "secrets.toml").write_text('password = "hunter2"\n')
+    (tmp_path / ".env").write_text("EMAIL_PASSWORD=hunter2\n")
+    con = connect()
+    sources = register_sources(con)
+    assert sources == {"Live": "live", "backtests/rsi.csv": "bt_rsi"}
+    return con
+
+
+def test_views_still_work(con):
+    assert run_sql(con, "SELECT sum(pnl) AS pnl FROM live")["pnl"][0] == 12.5
+    assert run_sql(con, "SELECT count(*) AS n FROM backtests")["n"][0] == 1
+    assert len(run_sql(con.cursor(), "SELECT * FROM read_csv('trade_logs/*.csv')")) == 1
+
+
+def test_sources_version_follows_the_csv_files(con, tmp_path):
+    before = sources_version()
+    (tmp_path / "backtests" / "macd.csv").write_text(TRADES)
+    assert sources_version() != before
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT * FROM read_text('.streamlit/secrets.toml')",
+    "SELECT * FROM read_csv('.env')",
+    "SELECT * FROM read_csv('/etc/passwd')",
+    "SELECT * FROM read_text('trade_logs/../.env')",
+    "SELECT * FROM read_blob('/etc/hostname')",
+    "SELECT * FROM glob('/*')",
+])
+def test_file_reading_queries_are_refused(con, sql):
+    with pytest.raises(duckdb.PermissionException):
+        run_sql(con.cursor(), sql)
+
+
+def test_lock_cannot_be_lifted(con):
+    with pytest.raises(ValueError):
+        run_sql(con, "SET enable_external_access = true")
+    with pytest.raises(duckdb.Error):
+        con.execute("SET enable_external_access = true")
+
+
+def test_summary_matches_summary_metrics(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "trade_logs").mkdir()
+    rng = np.random.default_rng(11)
+    trades = pd.DataFrame({
+        "timestamp": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.permutation(300), unit="h"),
+        "symbol": "EURUSD", "pnl": rng.normal(0.3, 10, 300).round(2),
+    })
+    trades.loc[::17, "pnl"] = np.nan
+    trades.to_csv(tmp_path / "trade_logs" / "trade_log.csv", index=False)
+    con = connect()
+    register_sources(con)
+
+    got = chart(con, "summary", "live").iloc[0]
+    want = summary_metrics(trades)
+    for name in got.index:
+        assert got[name] == pytest.approx(want[name], rel=1e-9), name
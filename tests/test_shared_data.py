@@ -0,0 +1,40 @@
+import os, stat
+import pytest
+import shared_data
+
+LOG = """timestamp,symbol,type,volume,price,pnl
+2025-06-15 22:00:00,EURUSD,buy,0.1,1.1,40.0
+"""
+
+
+@pytest.fixture
+def shared_dir(tmp_path, monkeypatch):
+    folder = tmp_path / "shm"
+    monkeypatch.setattr(shared_data, "SHARED_DIR", str(folder))
+    return folder
+
+
+def write_log(path, text=LOG):
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_published_files_are_private(tmp_path, shared_dir):
+    out = shared_data.publish(write_log(tmp_path / "a.csv"))
+    assert stat.S_IMODE(os.stat(shared_dir).st_mode) == 0o700
+    assert stat.S_IMODE(os.stat(out).st_mode) == 0o600
+    assert shared_data.open_table(str(tmp_path / "a.csv")).num_rows == 1
+
+
+def test_old_versions_and_deleted_sources_are_removed(tmp_path, shared_dir):
+    a = write_log(tmp_path / "a.csv")
+    b = write_log(tmp_path / "b.csv")
+    first_a, first_b = shared_data.publish(a), shared_data.publish(b)
+
+    os.remove(b)
+    write_log(tmp_path / "a.csv", LOG + "2025-06-15 23:00:00,EURUSD,buy,0.1,1.1,-5.0\n")
+    second_a = shared_data.publish(a)
+
+    assert second_a != first_a
+    assert sorted(os.listdir(shared_dir)) == [os.path.basename(second_a)]
+    assert not os.path.exists(first_b)
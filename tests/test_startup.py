@@ -0,0 +1,23 @@
+import pytest
+import check_startup
+from conftest import ROOT
+
+
+@pytest.fixture(autouse=True)
+def in_repo(monkeypatch):
+    monkeypatch.chdir(ROOT)
+
+
+def test_dashboards_are_found():
+    assert "dashboard_with_backtest.py" in check_startup.dashboards()
+
+
+@pytest.mark.parametrize("path", check_startup.BOTS)
+def test_bot_startup(path):
+    assert "pandas" not in check_startup.startup_imports(path)
+    assert check_startup.check(path, "bot")
+
+
+def test_dashboard_startup():
+    failed = [p for p in check_startup.dashboards() if not check_startup.check(p, "dashboard")]
+    assert not failed
@@ -0,0 +1,16 @@
+import pytest
+from strategies import STRATEGIES, load
+
+
+def test_params_are_the_declared_ones():
+    rsi, macd = load(["rsi", "macd"], {"rsi": {"buy_below": 25}})
+    assert rsi.params == {"buy_below": 25}
+    assert rsi.label == "RSI < 25"
+    assert macd.params == {}
+    assert STRATEGIES["rsi"].buy_below == 30  # the class default is untouched
+
+
+@pytest.mark.parametrize("key", ["name", "signal", "needs", "buy_above"])
+def test_undeclared_params_are_refused(key):
+    with pytest.raises(TypeError, match=key):
+        STRATEGIES["rsi_macd_sma"](**{key: 1})
@@ -0,0 +1,117 @@
+import math, os, queue, re, sys, threading
+from datetime import datetime, timedelta
+import pytest
+import sim_mt5
+import supervisor
+from trade_record import TradeRecord, read_trades
+
+BOT = "live_mt5_bot_with_trailing"
+
+
+class RecordingSupervisor(supervisor.Supervisor):
+    # Counts worker starts and notes when entries were halted
+    first_crash_rate = None
+    crash_rate = "0"
+
+    def __init__(self, *args, **kwargs):
+        self.starts = 0
+        self.halted_at = None
+        super().__init__(*args, **kwargs)
+
+    def start(self, i):
+        # Workers read SIM_CRASH_RATE at import: the first run of every shard
+        # always crashes, restarts use the normal rate
+        first = self.starts < len(self.shards)
+        os.environ["SIM_CRASH_RATE"] = self.first_crash_rate if first and self.first_crash_rate else self.crash_rate
+        self.starts += 1
+        super().start(i)
+
+    def record(self, trade):
+        super().record(trade)
+        if self.halt.is_set() and self.halted_at is None:
+            self.halted_at = datetime.now()
+
+
+@pytest.fixture
+def sim_env(tmp_path, monkeypatch):
+    # Every signal check buys (RSI < 101), fills are journaled under tmp_path
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("GIT_REPO_PATH", str(tmp_path))
+    monkeypatch.setenv("TRAIL_WAIT_SECONDS", "0")
+    monkeypatch.setenv("RSI_THRESHOLD", "101")
+    monkeypatch.setenv("TRACE_SAMPLE_RATE", "0")
+    monkeypatch.setenv("SIM_CRASH_RATE", "0")
+    monkeypatch.setenv("METRICS_PORT", "0")
+    monkeypatch.setitem(sys.modules, "MetaTrader5", sim_mt5)
+    monkeypatch.delitem(sys.modules, BOT, raising=False)  # re-read the env above
+    monkeypatch.setattr(supervisor, "RESTART_BACKOFF", (0.1, 0.1))
+    return tmp_path
+
+
+def journal(root):
+    return read_trades(os.path.join(root, "trade_logs", "trade_log.csv"))
+
+
+def filled(metrics_text):
+    # symbol -> order_send calls that came back TRADE_RETCODE_DONE
+    pattern = rf'^bot_order_retcode_total{{symbol="(\w+)",retcode="{sim_mt5.TRADE_RETCODE_DONE}"}} (\d+)$'
+    return {m[1]: int(m[2]) for m in re.finditer(pattern, metrics_text, re.M)}
+
+
+def test_crashing_shards_are_restarted_and_every_fill_journaled(sim_env):
+    cycles = 3
+    sup = RecordingSupervisor("trailing", simulate=True, interval=0, cycles=cycles, sync=False)
+    sup.first_crash_rate, sup.crash_rate = "1", "0.2"
+    sup.max_drawdown_pct = float("inf")  # never halt here
+    sup.run()
+
+    trades = journal(sim_env)
+    assert len(trades) == sup.trades
+    # Each shard's last run got through every cycle, earlier runs may add more
+    per_symbol = trades.groupby("symbol").size()
+    for symbol in sup.bot.SYMBOLS:
+        assert per_symbol.get(symbol, 0) >= cycles
+    assert set(sup.last_fill) == set(per_symbol.index)
+    # The supervisor's /metrics adds up every run of every shard
+    assert filled(sup.render_metrics()) == per_symbol.to_dict()
+    assert sup.restarts == sup.starts - len(sup.shards) >= len(sup.shards)
+    assert sup.done == set(range(len(sup.shards)))
+    assert not sup.halt.is_set()
+
+
+def test_drawdown_halts_new_entries_in_every_shard(sim_env):
+    cycles = 6
+    sup = RecordingSupervisor("trailing", simulate=True, interval=0.5, cycles=cycles, sync=False)
+    sup.max_drawdown_pct = 1e-9  # the first losing fill halts
+    sup.run()
+
+    trades = journal(sim_env)
+    assert len(trades) == sup.trades
+    assert sup.halt.is_set() and sup.halted_at is not None
+    # Only fills already in flight when the halt went out get through
+    assert trades["timestamp"].max() <= sup.halted_at + timedelta(seconds=0.25)
+    assert len(trades) < len(sup.bot.SYMBOLS) * cycles
+    assert sup.restarts == 0
+
+
+def test_restarted_worker_keeps_symbol_cooldowns(sim_env):
+    last_fill = datetime.now() - timedelta(minutes=5)
+    supervisor.run_worker(0, ["EURUSD"], "mt5_bot", True, None, 0, 0, queue.Queue(),
+                          threading.Event(), threading.Event(), {"EURUSD": last_fill})
+    bot = sys.modules["mt5_bot"]
+    assert bot.last_trade_time == {"EURUSD": last_fill}
+
+    bot.mt5.initialize()
+    try:
+        assert bot.trade_symbol("EURUSD") is None
+    finally:
+        bot.mt5.shutdown()
+    assert bot.SKIPPED_SIGNALS._values[("EURUSD", "cooldown")] == 1
+
+
+def test_missing_pnl_leaves_equity_alone(sim_env):
+    sup = supervisor.Supervisor("trailing", simulate=True, sync=False)
+    for pnl in (5.0, math.nan, -2.0):
+        sup.record(TradeRecord(timestamp=datetime.now(), symbol="EURUSD", pnl=pnl))
+    assert sup.equity == supervisor.START_EQUITY + 3
+    assert sup.trades == 3
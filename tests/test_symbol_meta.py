@@ -0,0 +1,56 @@
+from types import SimpleNamespace
+import pytest
+import sim_mt5
+import symbol_meta
+from symbol_meta import SymbolCache, SymbolMeta
+
+
+@pytest.fixture
+def cache():
+    sim_mt5.initialize()
+    yield SymbolCache(sim_mt5)
+    sim_mt5.shutdown()
+
+
+# Every symbol the bots trade, with each bot's SL/TP pips (mt5_bot 10/20, trailing bot 10/10)
+@pytest.mark.parametrize("symbol", list(sim_mt5.SYMBOLS))
+@pytest.mark.parametrize("side", ["buy", "sell"])
+@pytest.mark.parametrize("sl_pips, tp_pips", [(10, 20), (10, 10)])
+def test_bot_stops_are_placeable(cache, symbol, side, sl_pips, tp_pips):
+    tick = sim_mt5.symbol_info_tick(symbol)
+    price = tick.ask if side == "buy" else tick.bid
+    request, reason = cache.market_order(symbol, side, 0.1, price, sl_pips, tp_pips, magic=1, comment="test")
+    assert reason is None
+    assert abs(request["price"] - request["sl"]) >= cache.get(symbol).stops_level * cache.get(symbol).point
+
+
+def meta(name, digits):
+    return SymbolMeta(None, SimpleNamespace(
+        name=name, point=10 ** -digits, digits=digits, trade_contract_size=1, trade_tick_size=10 ** -digits,
+        trade_tick_value=1, volume_min=0.01, volume_max=100, volume_step=0.01, trade_stops_level=0,
+        filling_mode=0))
+
+
+def test_pip_sizes():
+    assert meta("EURUSD", 5).pip == pytest.approx(0.0001)
+    assert meta("USDJPY", 3).pip == pytest.approx(0.01)
+    assert meta("XAUUSD", 2).pip == 0.1
+    assert meta("BTCUSD.m", 2).pip == 1.0
+    assert meta("US30", 1).pip == pytest.approx(0.1)
+
+
+def test_stops_are_widened_to_the_broker_minimum(cache, monkeypatch):
+    monkeypatch.setattr(symbol_meta, "PIP_SIZES", {})
+    meta = cache.get("BTCUSD")  # one point per pip: 10 pips would be $0.10
+    tick = sim_mt5.symbol_info_tick("BTCUSD")
+    request, reason = cache.market_order("BTCUSD", "buy", 0.1, tick.ask, 10, 10, magic=1, comment="test")
+    assert reason is None
+    gap = request["price"] - request["sl"]
+    assert gap == pytest.approx((meta.stops_level + meta.spread + 1) * meta.point)
+
+
+def test_pnl_is_in_account_currency(cache):
+    # One pip on one lot: $10 on EURUSD, 1000 JPY converted at the price on USDJPY
+    assert cache.get("EURUSD").pnl(1.0850, 1.0851, 1) == pytest.approx(10)
+    price = sim_mt5.symbol_info_tick("USDJPY").bid
+    assert cache.get("USDJPY").pnl(price, price + 0.01, 1) == pytest.approx(1000 / price, rel=1e-2)
@@ -0,0 +1,32 @@
+import math
+from metrics import summary_metrics
+from datetime import datetime
+from trade_record import COLUMNS, TradeRecord, append_csv, read_trades
+
+OLD_LOG = """timestamp,symbol,type,volume,price,sl,tp,comment,strategy,close_price,pnl,exit_reason,trailing_hit,exit_emoji
+2025-06-15 22:00:00,EURUSD,buy,0.1,1.1,1.098,1.104,RSI+MACD+SMA,rsi_macd_sma,1.104,40.0,TP,False,🎯
+2025-06-15 22:10:00,GBPUSD,sell,0.1,1.3,1.302,1.296,RSI+MACD+SMA,rsi_macd_sma,1.296,,TP,False,🎯
+2025-06-15 22:20:00,GBPUSD,sell,0.1,1.3,1.302,1.296,RSI+MACD+SMA,rsi_macd_sma,1.296,n/a,SL,True,🛑
+"""
+
+
+def test_missing_pnl_stays_nan_and_metrics_skip_it(tmp_path):
+    path = tmp_path / "trade_log.csv"
+    path.write_text(OLD_LOG, encoding="utf-8")
+    trades = read_trades(str(path))
+    assert tuple(trades.columns) == COLUMNS
+    assert trades["pnl"].iloc[0] == 40.0
+    assert math.isnan(trades["pnl"].iloc[1]) and math.isnan(trades["pnl"].iloc[2])
+    assert trades["close_time"].isna().all()
+    assert trades["trailing_hit"].tolist() == [False, False, True]
+    stats = summary_metrics(trades)
+    assert stats["Trades"] == 1 and stats["Win_Rate"] == 100
+
+
+def test_record_without_pnl_is_written_as_missing(tmp_path):
+    path = str(tmp_path / "trade_log.csv")
+    append_csv(path, [TradeRecord(timestamp=datetime(2025, 6, 15, 22), symbol="EURUSD", type="buy", pnl=12.5),
+                      TradeRecord(timestamp=datetime(2025, 6, 15, 23), symbol="EURUSD", type="buy")])
+    trades = read_trades(path)
+    assert trades["pnl"].iloc[0] == 12.5
+    assert math.isnan(trades["pnl"].iloc[1])
@@ -0,0 +1,146 @@
+import json, os
+import numpy as np
+import pandas as pd
+import pytest
+from backtest import BARS_DIR, META_FIELDS, bars_path, first_exit, load_meta
+from whatif import ExitPaths
+
+HORIZON = 24
+# symbol: (start price, digits, volatility per bar)
+SPECS = {"EURUSD": (1.0850, 5, 0.0006), "USDJPY": (151.50, 3, 0.08)}
+
+
+def write_bars(symbol, start, digits, vol, n, rng, server_offset=0):
+    # Gap-free bars (each opens at the previous close), so a level is only
+    # ever reached inside a bar, where both engines fill at the level
+    close = start + np.cumsum(rng.normal(0, vol, n))
+    open_ = np.r_[start, close[:-1]]
+    wick = np.abs(rng.normal(0, vol / 2, (2, n)))
+    bars = pd.DataFrame({
+        "time": pd.date_range("2024-01-01", periods=n, freq="15min"),
+        "open": open_, "high": np.maximum(open_, close) + wick[0],
+        "low": np.minimum(open_, close) - wick[1], "close": close,
+    })
+    path = bars_path(symbol)
+    bars.to_parquet(path, index=False)
+    point = 10 ** -digits
+    info = dict(name=symbol, point=point, digits=digits, trade_contract_size=100_000, trade_tick_size=point,
+                trade_tick_value=100_000 * point, volume_min=0.01, volume_max=100.0, volume_step=0.01,
+                trade_stops_level=0, filling_mode=3)
+    with open(path.replace(".parquet", ".json"), "w", encoding="utf-8") as f:
+        json.dump({**{k: info[k] for k in META_FIELDS}, "server_offset": server_offset}, f)
+    return bars
+
+
+def make_market(server_offset=0):
+    # Bars per symbol plus entries on them; entry times are on the bars' clock
+    os.makedirs(BARS_DIR)
+    rng = np.random.default_rng(3)
+    bars, trades = {}, []
+    for symbol, (start, digits, vol) in SPECS.items():
+        bars[symbol] = b = write_bars(symbol, start, digits, vol, 600, rng, server_offset)
+        # Entries at a bar's close, some close enough to the end to run out of bars
+        for i in np.r_[rng.choice(len(b) - 10, 80, replace=False), len(b) - 3]:
+            trades.append({"timestamp": b["time"][i], "symbol": symbol, "type": rng.choice(["buy", "sell"]),
+                           "volume": 0.1, "price": b["close"][i], "pnl": 0.0, "entry": i})
+    return bars, pd.DataFrame(trades).sample(frac=1, random_state=0).reset_index(drop=True)
+
+
+@pytest.fixture
+def market(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return make_market()
+
+
+def reference(bars, trades, sl_pips, tp_pips):
+    rows = []
+    for t in trades.itertuples():
+        b = bars[t.symbol]
+        meta = load_meta(bars_path(t.symbol))
+        sign = 1 if t.type == "buy" else -1
+        sl, tp = t.price - sign * sl_pips * meta.pip, t.price + sign * tp_pips * meta.pip
+        k, price, reason = first_exit(b["high"].to_numpy(), b["low"].to_numpy(), b["close"].to_numpy(),
+                                      t.entry, t.type, sl, tp, HORIZON)
+        rows.append({"timestamp": t.timestamp, "symbol": t.symbol, "close_time": b["time"][k],
+                     "exit_reason": reason, "pnl": meta.pnl(t.price, price, t.volume, t.type)})
+    return pd.DataFrame(rows)
+
+
+@pytest.mark.parametrize("sl, tp", [(10, 20), (5, 5), (30, 10), (1000, 1000)])
+def test_simulate_matches_first_exit(market, sl, tp):
+    bars, trades = market
+    paths = ExitPaths(trades.drop(columns="entry"), "M15", horizon=HORIZON)
+    assert paths.n == len(trades)
+    sim = paths.simulate(sl, tp).sort_values(["symbol", "timestamp"]).reset_index(drop=True)
+    want = reference(bars, trades, sl, tp).sort_values(["symbol", "timestamp"]).reset_index(drop=True)
+
+    assert sim["exit_reason"].tolist() == want["exit_reason"].tolist()
+    assert (sim["close_time"] == want["close_time"]).all()
+    np.testing.assert_allclose(sim["pnl"], want["pnl"], rtol=1e-5, atol=1e-3)
+    # Tight levels must exercise both stops and targets, wide ones only time exits
+    reasons = set(want["exit_reason"])
+    if sl == 1000:
+        assert reasons == {"TIME"}
+    else:
+        assert {"SL", "TP"} <= reasons
+
+
+def trailing_reference(bars, trades, sl, tp, trigger, offset):
+    # Bar-by-bar loop in pips: the stop starts at -sl and, once the best
+    # excursion of the bars so far reaches `trigger`, trails `offset` behind it
+    rows = []
+    for t in trades.itertuples():
+        b = bars[t.symbol]
+        meta = load_meta(bars_path(t.symbol))
+        sign = 1 if t.type == "buy" else -1
+        last = min(t.entry + HORIZON, len(b) - 1)
+        peak, stop = -np.inf, -sl
+        for k in range(t.entry + 1, last + 1):
+            fav = sign * ((b["high"] if sign > 0 else b["low"])[k] - t.price) / meta.pip
+            adv = sign * ((b["low"] if sign > 0 else b["high"])[k] - t.price) / meta.pip
+            opened = sign * (b["open"][k] - t.price) / meta.pip
+            if peak >= trigger:
+                stop = max(peak - offset, -sl)
+            if adv <= stop:
+                pips, reason = min(stop, opened), "Trailing" if stop > -sl else "SL"
+                break
+            if fav >= tp:
+                pips, reason = max(tp, opened), "TP"
+                break
+            peak = max(peak, fav)
+        else:
+            pips, reason = sign * (b["close"][last] - t.price) / meta.pip, "TIME"
+        rows.append({"timestamp": t.timestamp, "symbol": t.symbol, "close_time": b["time"][k],
+                     "exit_reason": reason, "pnl": pips * meta.pip / meta.tick_size * meta.tick_value * t.volume})
+    return pd.DataFrame(rows)
+
+
+@pytest.mark.parametrize("sl, tp, trigger, offset", [(10, 40, 5, 2), (20, 20, 8, 8), (15, 1000, 3, 1)])
+def test_trailing_matches_bar_loop(market, sl, tp, trigger, offset):
+    bars, trades = market
+    paths = ExitPaths(trades.drop(columns="entry"), "M15", horizon=HORIZON)
+    sim = paths.simulate(sl, tp, trigger, offset).sort_values(["symbol", "timestamp"]).reset_index(drop=True)
+    want = trailing_reference(bars, trades, sl, tp, trigger, offset)
+    want = want.sort_values(["symbol", "timestamp"]).reset_index(drop=True)
+
+    assert sim["exit_reason"].tolist() == want["exit_reason"].tolist()
+    assert (sim["close_time"] == want["close_time"]).all()
+    np.testing.assert_allclose(sim["pnl"], want["pnl"], rtol=1e-5, atol=1e-3)
+    assert "Trailing" in set(want["exit_reason"])
+
+
+def test_local_trade_times_are_moved_to_server_time(tmp_path, monkeypatch):
+    # Bars stamped two hours ahead of the bot's clock, as with a UTC+2 broker
+    monkeypatch.chdir(tmp_path)
+    shift = pd.Timedelta(hours=2)
+    bars, trades = make_market(server_offset=int(shift.total_seconds()))
+    local = trades.drop(columns="entry").assign(timestamp=trades["timestamp"] - shift)
+
+    sim = ExitPaths(local, "M15", horizon=HORIZON).simulate(10, 20)
+    server = ExitPaths(trades.drop(columns="entry"), "M15", horizon=HORIZON, local_time=False).simulate(10, 20)
+    sim, server = (s.sort_values(["symbol", "timestamp"]).reset_index(drop=True) for s in (sim, server))
+    assert len(sim) == len(trades)
+    assert sim["exit_reason"].tolist() == server["exit_reason"].tolist()
+    np.testing.assert_allclose(sim["pnl"], server["pnl"])
+    # Results come back on the trades' own clock
+    assert ((server["close_time"] - sim["close_time"]) == shift).all()
@@ -0,0 +1,107 @@
+import json, os, random, threading, time
+from contextlib import contextmanager
+
+# 🔬 Per-cycle span tracing in Chrome trace-event format (open the file in
+# chrome://tracing or https://ui.perfetto.dev). A cycle is either fully traced
+# or not at all (TRACE_SAMPLE_RATE); unsampled spans cost one attribute lookup.
+# Events of a sampled cycle are buffered and appended in one write, and the
+# file rotates to .1 .. .N once it passes TRACE_MAX_BYTES.
+
+TRACE_DIR = os.getenv("TRACE_DIR", "logs")
+SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.2"))
+MAX_BYTES = int(os.getenv("TRACE_MAX_BYTES", 5_000_000))
+BACKUPS = int(os.getenv("TRACE_BACKUPS", 3))
+
+
+def trace_path(bot, root="."):
+    # <root>/<TRACE_DIR>/trace_<bot>.json (an absolute TRACE_DIR ignores root)
+    return os.path.join(root, TRACE_DIR, f"trace_{bot}.json")
+
+
+class Tracer:
+    def __init__(self, path, sample_rate=SAMPLE_RATE, max_bytes=MAX_BYTES, backups=BACKUPS):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._cycles = 0
+
+    @contextmanager
+    def cycle(self, name="cycle", **args):
+        if random.random() >= self.sample_rate:
+            yield
+            return
+        self._cycles += 1
+        self._local.events = []
+        self._local.stack = []
+        self._local.cycle_id = f"{os.getpid()}-{int(time.time())}-{self._cycles}"
+        try:
+            with self.span(name, **args):
+                yield
+        finally:
+            events, self._local.events = self._local.events, None
+            self._write(events)
+
+    @contextmanager
+    def span(self, name, **args):
+        events = getattr(self._local, "events", None)
+        if events is None:
+            yield
+            return
+        stack = self._local.stack
+        stack.append(name)
+        path = "/".join(stack)
+        ts = time.time_ns() // 1000
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            stack.pop()
+            events.append({
+                "name": name, "cat": "bot", "ph": "X",
+                "ts": ts, "dur": (time.perf_counter_ns() - start) // 1000,
+                "pid": os.getpid(), "tid": threading.get_ident(),
+                "args": dict(args, cycle=self._local.cycle_id, path=path),
+            })
+
+    def _write(self, events):
+        if not events:
+            return
+        lines = "".join(json.dumps(e, default=str) + ",\n" for e in events)
+        with self._write_lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            if os.path.exists(self.path) and os.path.getsize(self.path) > self.max_bytes:
+                self._rotate()
+            new_file = not os.path.exists(self.path)
+            with open(self.path, "a", encoding="utf-8") as f:
+                # JSON Array Format: Chrome accepts a missing closing bracket
+                f.write(("[\n" if new_file else "") + lines)
+
+    def _rotate(self):
+        for i in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{i}"):
+                os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+
+def read_trace(path):
+    # Parse a (possibly still open) trace file back into a list of events
+    with open(path, encoding="utf-8") as f:
+        text = f.read().strip().rstrip(",")
+    if not text:
+        return []
+    if not text.endswith("]"):
+        text += "]"
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        # Torn last line from a crash mid-write: keep every complete event
+        events = []
+        for line in text.lstrip("[").splitlines():
+            try:
+                events.append(json.loads(line.strip().rstrip(",]")))
+            except json.JSONDecodeError:
+                pass
+        return events
@@ -0,0 +1,116 @@
+import csv, os
+
+# 🧾 One trade schema for every writer (both bots, the supervisor, backtests)
+# and every reader. TradeRecord is a __slots__ object (no per-trade dict or
+# one-row DataFrame); append_csv writes a batch of records in one go, and
+# append_rows is the same writer for the bots' other CSV logs.
+# read_trades / normalize turn any trade file, including logs written before
+# this schema existed, into a frame with every column and fixed dtypes, so
+# dashboards never have to guess which columns or date formats a file has.
+
+COLUMNS = (
+    "timestamp", "close_time", "symbol", "type", "volume", "price", "sl", "tp",
+    "comment", "strategy", "pnl", "close_price", "exit_reason", "holding_time",
+    "trailing_hit", "adjusted_sl",
+)
+TIME_COLUMNS = ("timestamp", "close_time")
+FLOAT_COLUMNS = ("volume", "price", "sl", "tp", "pnl", "close_price", "holding_time", "adjusted_sl")
+DEFAULTS = {"comment": "", "strategy": "", "pnl": float("nan"), "exit_reason": "", "trailing_hit": False}
+EXIT_EMOJI = {"TP": "🎯", "SL": "🛑", "Trailing": "🏃", "TIME": "⌛"}
+
+
+class TradeRecord:
+    __slots__ = COLUMNS
+
+    def __init__(self, **fields):
+        for name in COLUMNS:
+            setattr(self, name, fields.pop(name, DEFAULTS.get(name)))
+        if fields:
+            raise TypeError(f"Unknown trade fields: {', '.join(fields)}")
+
+    # Mapping protocol, so `**record` and dict(record) work (event payloads)
+    def keys(self):
+        return COLUMNS
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+    @property
+    def exit_emoji(self):
+        return EXIT_EMOJI.get(self.exit_reason, "")
+
+    def row(self):
+        # CSV cells: seconds-precision ISO times, "" for missing values
+        out = []
+        for name in COLUMNS:
+            v = getattr(self, name)
+            if v is None or v != v:  # None or NaN
+                v = ""
+            elif name in TIME_COLUMNS and hasattr(v, "isoformat"):
+                v = v.isoformat(sep=" ", timespec="seconds")
+            out.append(v)
+        return out
+
+    def __repr__(self):
+        return f"TradeRecord({self.timestamp} {self.symbol} {self.type} {self.volume} @ {self.price}, pnl={self.pnl})"
+
+
+# --- Writers ---
+def _migrate_csv(path):
+    # Rewrite a log with an older header into COLUMNS order, once
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    tmp = path + ".tmp"
+    with open(tmp, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+    os.replace(tmp, path)
+    print(f"🧾 Migrated {path} to the current trade schema ({len(rows)} rows)")
+
+
+def append_rows(path, header, rows):
+    # Plain append; the header goes in only when the file is new or empty
+    new_file = not (os.path.exists(path) and os.path.getsize(path))
+    with open(path, "a", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        if new_file:
+            writer.writerow(header)
+        writer.writerows(rows)
+
+
+def append_csv(path, records):
+    if os.path.exists(path) and os.path.getsize(path):
+        with open(path, newline="", encoding="utf-8") as f:
+            header = next(csv.reader(f), [])
+        if tuple(header) != COLUMNS:
+            _migrate_csv(path)
+    append_rows(path, COLUMNS, (r.row() for r in records))
+
+
+# --- Readers ---
+def normalize(df):
+    # Any trade frame -> exactly COLUMNS with fixed dtypes. Old live logs lack
+    # close_time (mt5_bot) or close_price/exit_reason (trailing bot); those come
+    # back as NaT/NaN/"". A missing or unparseable pnl stays NaN (metrics skip
+    # it). Unknown columns (e.g. exit_emoji) are dropped.
+    import pandas as pd
+    out = pd.DataFrame(index=df.index)
+    for name in COLUMNS:
+        col = df[name] if name in df.columns else pd.Series(None, index=df.index, dtype=object)
+        if name in TIME_COLUMNS:
+            out[name] = pd.to_datetime(col, format="ISO8601", errors="coerce").astype("datetime64[ns]")
+        elif name in FLOAT_COLUMNS:
+            out[name] = pd.to_numeric(col, errors="coerce").astype("float64")
+        elif name == "trailing_hit":
+            out[name] = col.astype(str).str.lower().eq("true")
+        else:
+            out[name] = col.astype(object).fillna(DEFAULTS.get(name, "")).astype(str)
+    return out.reset_index(drop=True)
+
+
+def read_trades(path):
+    import pandas as pd
+    if path.endswith(".parquet"):
+        return normalize(pd.read_parquet(path))
+    return normalize(pd.read_csv(path, dtype=str, keep_default_na=False, na_values=[""]))
@@ -0,0 +1,134 @@
+import os
+import numpy as np
+import pandas as pd
+from backtest import bars_path, load_bars, load_meta, load_server_offset
+
+# 🔮 What-if exits: replays the logged entries against stored bars (bars/, see
+# backtest.py fetch) with different SL / TP / trailing settings. The expensive
+# part, each trade's price path after entry as pips from the entry price, is
+# built once per trade file; every re-simulation after that is a handful of
+# vectorized comparisons over the (trades x bars) matrix, so slider changes
+# stay interactive even for 100k trades.
+#
+# Live logs are stamped with the bot machine's local clock and bars with MT5
+# server time; entries are moved by the offset saved with the bars before they
+# are matched (local_time=False for trades already in server time, e.g. the
+# backtester's output).
+#
+#   paths = ExitPaths(trades, "M15", horizon=96)
+#   sim = paths.simulate(sl=10, tp=15, trail_trigger=8, trail_offset=3)
+
+REASONS = np.array(["SL", "TP", "Trailing", "TIME"])
+BLOCK_ROWS = 2048
+
+
+def _first(mask):
+    # Column of the first True per row, or mask.shape[1] when there is none
+    i = mask.argmax(axis=1)
+    return np.where(mask[np.arange(len(mask)), i], i, mask.shape[1])
+
+
+class ExitPaths:
+    def __init__(self, trades, timeframe="M15", horizon=96, local_time=True):
+        self.horizon = horizon
+        parts = []
+        for symbol, group in trades.groupby("symbol", sort=False):
+            path = bars_path(symbol, timeframe)
+            if os.path.exists(path):
+                offset = np.timedelta64(load_server_offset(path) if local_time else 0, "s")
+                parts.append(self._symbol_paths(group, load_bars(path), load_meta(path), horizon, offset))
+        parts = [p for p in parts if len(p["trades"])]
+        self.n = sum(len(p["trades"]) for p in parts)
+        if not self.n:
+            self.trades = trades.iloc[:0]
+            return
+
+        # Concatenate, then order by entry time so the equity curve is chronological
+        offsets = np.cumsum([0] + [len(p["times"]) for p in parts[:-1]])
+        self.times = np.concatenate([p["times"] for p in parts])
+        self.opens = np.concatenate([p["opens"] for p in parts])
+        start = np.concatenate([p["start"] + off for p, off in zip(parts, offsets)])
+        trades = pd.concat([p["trades"] for p in parts])
+        order = np.argsort(trades["timestamp"].to_numpy(), kind="stable")
+        self.trades = trades.iloc[order].reset_index(drop=True)
+        self.start = start[order]
+        for name in ("fav", "adv", "peak", "last_close", "pip_value", "entry", "side", "pip", "offset"):
+            setattr(self, name, np.concatenate([p[name] for p in parts])[order])
+        self.n_valid = np.concatenate([p["n_valid"] for p in parts])[order]
+        for name in ("fav", "adv", "peak"):
+            getattr(self, name).flags.writeable = False  # shared by every session
+
+    @staticmethod
+    def _symbol_paths(group, bars, meta, horizon, offset):
+        times = bars["time"].to_numpy(dtype="datetime64[ns]")
+        entry_time = group["timestamp"].to_numpy(dtype="datetime64[ns]") + offset  # in server time
+        # The entry bar's remaining path is unknown, so replay from the next bar
+        start = np.searchsorted(times, entry_time, side="right")
+        keep = (start < len(times)) & (entry_time >= times[0]) & group["price"].notna().to_numpy()
+        group, start = group[keep], start[keep]
+
+        idx = start[:, None] + np.arange(horizon)
+        valid = idx < len(times)
+        idx = np.minimum(idx, len(times) - 1)
+        entry = group["price"].to_numpy(dtype=float)[:, None]
+        buy = (group["type"].to_numpy() == "buy")[:, None]
+        high, low, close = (bars[c].to_numpy(dtype=float)[idx] for c in ("high", "low", "close"))
+        pip = meta.pip
+
+        # Pips in the trade's favour: best and worst of each bar, and its close
+        fav = np.where(buy, high - entry, entry - low) / pip
+        adv = np.where(buy, low - entry, entry - high) / pip
+        close = np.where(buy, close - entry, entry - close) / pip
+        for a in (fav, adv, close):
+            a[~valid] = np.nan
+        # Best excursion before each bar: where a trailing stop would sit entering it
+        peak = np.full_like(fav, -np.inf)
+        peak[:, 1:] = np.fmax.accumulate(fav, axis=1)[:, :-1]
+        n_valid = valid.sum(axis=1)
+        return {
+            "trades": group[["timestamp", "symbol", "type", "volume", "price", "pnl"]],
+            "times": times, "opens": bars["open"].to_numpy(dtype=float), "start": start, "n_valid": n_valid,
+            "entry": entry[:, 0], "side": np.where(buy[:, 0], 1.0, -1.0), "pip": np.full(len(group), pip),
+            "offset": np.full(len(group), offset, dtype="timedelta64[ns]"),
+            "fav": fav.astype(np.float32), "adv": adv.astype(np.float32),
+            "peak": peak.astype(np.float32),
+            "last_close": close[np.arange(len(close)), n_valid - 1],
+            "pip_value": pip / meta.tick_size * meta.tick_value * group["volume"].to_numpy(dtype=float),
+        }
+
+    def _exits(self, rows, sl, tp, trail_trigger, trail_offset):
+        # (first stop bar, stop level there, first TP bar) for a block of rows
+        adv, fav = self.adv[rows], self.fav[rows]
+        if trail_trigger > 0:
+            peak = self.peak[rows]
+            stop = np.where(peak >= trail_trigger, np.maximum(peak - trail_offset, -sl), -sl)
+            i_stop = _first(adv <= stop)
+            level = stop[np.arange(len(stop)), np.minimum(i_stop, self.horizon - 1)]
+        else:
+            i_stop = _first(adv <= -sl)
+            level = np.full(len(adv), -float(sl))
+        return i_stop, level, _first(fav >= tp)
+
+    def simulate(self, sl, tp, trail_trigger=0, trail_offset=0):
+        # Trade frame with the re-simulated exits. A bar that touches both a stop
+        # and TP counts as the stop. A bar that opens through a level fills at
+        # its open. Rows go in blocks so the work stays in cache.
+        parts = [self._exits(slice(i, i + BLOCK_ROWS), sl, tp, trail_trigger, trail_offset)
+                 for i in range(0, self.n, BLOCK_ROWS)]
+        i_stop, level, i_tp = (np.concatenate(p) for p in zip(*parts))
+
+        stopped = (i_stop <= i_tp) & (i_stop < self.n_valid)
+        took_profit = ~stopped & (i_tp < self.n_valid)
+        exit_bar = np.where(stopped, i_stop, np.where(took_profit, i_tp, self.n_valid - 1))
+        bar = self.start + exit_bar
+        open_pips = self.side * (self.opens[bar] - self.entry) / self.pip
+        exit_pips = np.where(stopped, np.minimum(level, open_pips),
+                             np.where(took_profit, np.maximum(tp, open_pips), self.last_close))
+        reason = np.where(stopped, np.where(level > -sl, 2, 0), np.where(took_profit, 1, 3))
+
+        sim = self.trades[["timestamp", "symbol", "type"]].copy()
+        sim["close_time"] = self.times[bar] - self.offset  # back on the trades' clock
+        sim["pnl"] = exit_pips * self.pip_value
+        sim["exit_pips"] = exit_pips
+        sim["exit_reason"] = REASONS[reason]
+        return sim